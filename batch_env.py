@@ -0,0 +1,274 @@
+import numpy as np
+
+from pacman import (MAP_LAYOUT, DIRECTIONS, FOOD, ENERGY, SIM_DT, CELL_SIZE, BLUE, WHITE, GREEN,
+                    GHOST_MOVE_MS, SCARED_MOVE_MS, SCARE_MS, SCARE_BLINK_MS,
+                    compile_maze, Simulation, PacmanAgent, Ghost)
+
+# =============================================================================
+# TOPLU (VEKTÖREL) SİMÜLASYON
+# =============================================================================
+# N oyunun durumu NumPy dizilerinde tutulur ve tek step(actions) çağrısıyla
+# hepsi birlikte ilerler. Kurallar Simulation.step ve GhostManager.step ile
+# aynıdır (aynı hayalet sabitleri); hücreler CompiledMaze'in açık hücre
+# indeksleriyle temsil edilir.
+
+NOOP = -1  # Aksiyon: hareket etme (diğerleri DIRECTIONS indeksi)
+
+
+class BatchSimulation:
+    def __init__(self, num_games, layout=MAP_LAYOUT, seed=None, move_delay=200, dt=SIM_DT):
+        self.maze = compile_maze(layout)
+        if self.maze.step is None:
+            raise ValueError("BatchSimulation için harita en kısa yol tablosuna sığmalı (MAX_TABLE_CELLS)")
+        self.num_games = num_games
+        self.move_delay = move_delay  # Pacman'in iki hamlesi arası (ms)
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+
+        n = self.maze.n
+        # Komşu tablosu: neighbors[hücre, yön] -> hücre (duvar ise -1); maze.moves üzerine kopyasız görünüm
+        self.neighbors = np.frombuffer(self.maze.moves, dtype=np.intc).reshape(n, 4)
+        self.first_step = np.frombuffer(self.maze.step, dtype=np.int8).reshape(n, n)
+
+        # Başlangıç durumu (tüm oyunlar için ortak şablon)
+        self.initial_pellets = np.zeros(n, dtype=np.uint8)
+        ghost_cells = []
+        for y, row in enumerate(self.maze.layout):
+            for x, char in enumerate(row):
+                if char == '.': self.initial_pellets[self.maze.index[(x, y)]] = FOOD
+                elif char == 'o': self.initial_pellets[self.maze.index[(x, y)]] = ENERGY
+                elif char == 'P': self.pacman_start = self.maze.index[(x, y)]
+                elif char == 'G': ghost_cells.append(self.maze.index[(x, y)])
+        self.ghost_start = np.array(ghost_cells, dtype=np.int32)
+        self.num_ghosts = len(ghost_cells)
+
+        N, G = num_games, self.num_ghosts
+        self.pacman = np.zeros(N, dtype=np.int32)
+        self.pellets = np.zeros((N, n), dtype=np.uint8)
+        self.pellets_left = np.zeros(N, dtype=np.int32)
+        self.score = np.zeros(N, dtype=np.int64)
+        self.time_ms = np.zeros(N, dtype=np.float64)
+        self.move_timer = np.zeros(N, dtype=np.float64)
+        self.game_over = np.zeros(N, dtype=bool)
+        self.win = np.zeros(N, dtype=bool)
+
+        self.ghosts = np.zeros((N, G), dtype=np.int32)
+        self.ghost_alive = np.zeros((N, G), dtype=bool)
+        self.ghost_timer = np.zeros((N, G), dtype=np.float64)
+        self.scared = np.zeros((N, G), dtype=bool)
+        self.scaring_over = np.zeros((N, G), dtype=bool)
+        self.scared_since = np.zeros((N, G), dtype=np.float64)
+        self.reset()
+
+    def reset(self, games=None):
+        # games: sıfırlanacak oyunların indeksleri / maskesi (None = hepsi)
+        g = slice(None) if games is None else games
+        self.pacman[g] = self.pacman_start
+        self.pellets[g] = self.initial_pellets
+        self.pellets_left[g] = np.count_nonzero(self.initial_pellets)
+        self.score[g] = 0
+        self.time_ms[g] = 0
+        self.move_timer[g] = 0
+        self.game_over[g] = False
+        self.win[g] = False
+        self.ghosts[g] = self.ghost_start
+        self.ghost_alive[g] = True
+        self.ghost_timer[g] = 0
+        self.scared[g] = False
+        self.scaring_over[g] = False
+        self.scared_since[g] = 0
+
+    def decision_due(self):
+        # Bu adımda aksiyonu kullanılacak oyunlar (Pacman hamle zamanı gelmiş)
+        return ~self.game_over & (self.move_timer + self.dt > self.move_delay)
+
+    def _random_moves(self, cells):
+        # Korku modu: geçerli yönlerden rastgele biri (shuffle + ilk geçerli ile aynı dağılım)
+        nbs = self.neighbors[cells]
+        keys = np.where(nbs >= 0, self.rng.random(nbs.shape), -1.0)
+        pick = np.take_along_axis(nbs, keys.argmax(axis=-1)[..., None], axis=-1)[..., 0]
+        return np.where(pick >= 0, pick, cells)
+
+    def step(self, actions):
+        # actions: (N,) DIRECTIONS indeksi veya NOOP. Dönüş: (ödül, bitti) dizileri
+        actions = np.asarray(actions)
+        active = ~self.game_over
+        prev_score = self.score.copy()
+        dt = self.dt
+        rows = np.arange(self.num_games)
+
+        self.time_ms[active] += dt
+        self.move_timer[active] += dt
+
+        # Pacman hareketi
+        due = active & (self.move_timer > self.move_delay)
+        target = self.neighbors[self.pacman, np.clip(actions, 0, 3)]
+        moving = due & (actions >= 0) & (target >= 0)
+        self.pacman = np.where(moving, target, self.pacman)
+        self.move_timer[due] = 0
+
+        # 1-2. Yemek / Enerji topu yeme
+        kind = self.pellets[rows, self.pacman]
+        ate_food = active & (kind == FOOD)
+        ate_energy = active & (kind == ENERGY)
+        eaten = ate_food | ate_energy
+        self.pellets[rows[eaten], self.pacman[eaten]] = 0
+        self.pellets_left -= eaten
+        self.score += 10 * ate_food + 50 * ate_energy
+
+        scare = ate_energy[:, None] & self.ghost_alive
+        self.scared |= scare
+        self.scaring_over &= ~scare
+        self.scared_since = np.where(scare, self.time_ms[:, None], self.scared_since)
+
+        # 3. Yem kalmadıysa kazan
+        cleared = active & (self.pellets_left == 0)
+        self.game_over |= cleared
+        self.win |= cleared
+
+        # 4. Hayalet kalmadıysa kazan (+1000)
+        no_ghosts = active & ~self.ghost_alive.any(axis=1)
+        self.game_over |= no_ghosts
+        self.win |= no_ghosts
+        self.score += 1000 * no_ghosts
+
+        # 5. Hayaletler: korku süresi, zamanlayıcı, hareket
+        live = active[:, None] & self.ghost_alive
+        elapsed = self.time_ms[:, None] - self.scared_since
+        calm = live & self.scared & (elapsed > SCARE_MS)
+        self.scared &= ~calm
+        self.scaring_over = (self.scaring_over & ~calm) | (live & self.scared & (elapsed > SCARE_BLINK_MS))
+
+        self.ghost_timer[live] += dt
+        interval = np.where(self.scared, SCARED_MOVE_MS, GHOST_MOVE_MS)
+        moves = live & (self.ghost_timer >= interval)
+
+        pac = np.broadcast_to(self.pacman[:, None], self.ghosts.shape)
+        step_dir = self.first_step[self.ghosts, pac]
+        chase_to = self.neighbors[self.ghosts, np.clip(step_dir, 0, 3)]
+        chase_to = np.where(self.ghosts == pac, self.ghosts, chase_to)
+        lost = (step_dir < 0) & (self.ghosts != pac)  # BFS yol bulamadı -> rastgele
+        wander = self.scared | lost
+        if (moves & wander).any():
+            new_pos = np.where(wander, self._random_moves(self.ghosts), chase_to)
+        else:
+            new_pos = chase_to
+        self.ghosts = np.where(moves, new_pos, self.ghosts)
+        self.ghost_timer[moves] = 0
+
+        # Çarpışma: korkmuş hayalet yenir, değilse Pacman ölür
+        hit = live & (self.ghosts == self.pacman[:, None])
+        eat_ghost = hit & self.scared
+        self.score += 200 * eat_ghost.sum(axis=1)
+        self.ghost_alive &= ~eat_ghost
+        died = (hit & ~self.scared).any(axis=1)
+        self.game_over |= died
+        self.win &= ~died
+
+        return self.score - prev_score, self.game_over.copy()
+
+
+# =============================================================================
+# TEK OYUN ORTAMI (GYM TARZI API)
+# =============================================================================
+# Öğrenen ajanlar için Simulation üzerinde reset(seed) / step(action) arayüzü.
+# Bir step() Pacman'in bir kararıdır: aksiyon uygulanır ve bir sonraki karar
+# anına (veya oyun sonuna) kadar simülasyon adımları çalışır. Gözlem önceden
+# ayrılmış (kanal, y, x) uint8 dizisidir ve her adımda yerinde güncellenir.
+
+OBS_WALLS, OBS_PELLETS, OBS_PACMAN, OBS_GHOSTS, OBS_SCARED = range(5)  # Gözlem kanalları
+
+
+class PacmanEnv:
+    def __init__(self, layout=MAP_LAYOUT, max_ticks=None):
+        self.layout = list(layout)
+        self.max_ticks = max_ticks  # Verilirse bu adımda oyun kesilir (info['truncated'])
+        self.num_actions = len(DIRECTIONS)  # Ayrıca NOOP
+        self.height, self.width = len(self.layout), len(self.layout[0])
+        self.sim = None
+        self.pellet_view = None
+
+        # Gözlem: duvar kanalı sabit, yem kanalı sim.pellet_grid'den kopyalanır (FOOD/ENERGY değerleri)
+        self.obs = np.zeros((5, self.height, self.width), dtype=np.uint8)
+        self.obs[OBS_WALLS] = np.array([[c == 'W' for c in row] for row in self.layout], dtype=np.uint8)
+        self.cell_flat = np.array(compile_maze(self.layout).flat, dtype=np.intp)
+
+        # RGB kare (render) ilk istekte kurulur
+        self.surface = None
+        self.frame = None
+        self.background = None
+
+    def reset(self, seed=None):
+        self.sim = Simulation('AI', seed=seed, layout=self.layout)
+        # pellet_grid üzerinde kopyasız görünüm (reset'te yeni bytearray oluştuğu için burada)
+        self.pellet_view = np.frombuffer(self.sim.pellet_grid, dtype=np.uint8).reshape(self.height, self.width)
+        self._run_until_decision()
+        return self.observe()
+
+    def step(self, action):
+        # action: DIRECTIONS indeksi veya NOOP. Dönüş: (gözlem, ödül, bitti, info)
+        sim = self.sim
+        prev_score = sim.score
+        # Ortam her zaman karar anında durur: bu adım aksiyonu kullanır
+        sim.step((0, 0) if action == NOOP else DIRECTIONS[action])
+        self._run_until_decision()
+        truncated = self.max_ticks is not None and sim.ticks >= self.max_ticks and not sim.game_over
+        info = {'score': sim.score, 'ticks': sim.ticks, 'win': sim.win, 'end_reason': sim.end_reason,
+                'truncated': truncated}
+        return self.observe(), sim.score - prev_score, sim.game_over or truncated, info
+
+    def _run_until_decision(self):
+        sim = self.sim
+        while not sim.game_over and not sim.decision_due():
+            if self.max_ticks is not None and sim.ticks >= self.max_ticks: break
+            sim.step()
+
+    def observe(self):
+        # Aynı dizi döner; saklamak isteyen kopyalamalı
+        obs = self.obs
+        sim = self.sim
+        np.copyto(obs[OBS_PELLETS], self.pellet_view)
+        obs[OBS_PACMAN:].fill(0)
+        x, y = sim.pacman.grid_pos
+        obs[OBS_PACMAN, y, x] = 1
+        mgr = sim.ghost_manager
+        if len(mgr):
+            # Hayalet listelerinden toplu yazım (hücre indeksi -> y * genişlik + x)
+            flat = self.cell_flat[np.array(mgr.cell, dtype=np.intp)]
+            scared = np.array(mgr.scared, dtype=bool)
+            obs[OBS_GHOSTS].reshape(-1)[flat[~scared]] = 1
+            obs[OBS_SCARED].reshape(-1)[flat[scared]] = 1
+        return obs
+
+    def render(self):
+        # Oyunun (y, x, 3) RGB karesi. pygame.surfarray.pixels3d yüzeyin kendi
+        # belleğine bakan bir görünüm verir: kare kopyalanmaz, sonraki render'da
+        # üzerine yazılır. Görünüm yüzeyi kilitli tuttuğu için çizim blit yerine
+        # pygame.draw ve NumPy ile yapılır.
+        import pygame
+
+        if self.surface is None:
+            self.surface = pygame.Surface((self.width * CELL_SIZE, self.height * CELL_SIZE))
+            self.frame = pygame.surfarray.pixels3d(self.surface)
+            self.background = np.zeros_like(self.frame)
+            for y, row in enumerate(self.layout):
+                for x, char in enumerate(row):
+                    if char == 'W':
+                        self.background[x * CELL_SIZE:(x + 1) * CELL_SIZE, y * CELL_SIZE:(y + 1) * CELL_SIZE] = BLUE
+
+        sim = self.sim
+        surface = self.surface
+        np.copyto(self.frame, self.background)
+        half = CELL_SIZE // 2
+        # foods/energies değerleri zaten hücre merkezinin piksel koordinatı
+        for center in sim.foods.values(): pygame.draw.circle(surface, (255, 182, 193), center, 3)
+        energy_color = WHITE if (sim.time_ms // 300) % 2 == 0 else GREEN
+        for center in sim.energies.values(): pygame.draw.circle(surface, energy_color, center, 7)
+        pac = sim.pacman
+        pac.update_animation()
+        PacmanAgent.draw_shape(surface, pac.grid_pos[0] * CELL_SIZE + half, pac.grid_pos[1] * CELL_SIZE + half,
+                               *pac.sprite_key())
+        for g in sim.ghosts:
+            Ghost.draw_shape(surface, g.grid_pos[0] * CELL_SIZE + half, g.grid_pos[1] * CELL_SIZE + half,
+                             *g.sprite_key(sim.time_ms))
+        return self.frame.transpose(1, 0, 2)
@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+# Benchmark pencere/ses cihazı gerektirmesin
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pacman
+
+# =============================================================================
+# SICAK YOL BENCHMARK'LARI
+# =============================================================================
+# Her benchmark bir hazırlık fonksiyonudur: verilen harita için oyun durumunu
+# kurar ve tek bir çağrıyı ölçülecek fonksiyon olarak döndürür. Çağrılar tek tek zamanlanır,
+# ops/sn ve p50/p95/p99 raporlanır; --save ile JSON baseline yazılır,
+# sonraki çalıştırmalar p50'yi baseline ile karşılaştırır.
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+
+def tiled_layout(layout, nx, ny):
+    # Stok haritanın iç kısmını nx × ny kez döşeyerek bağlantılı büyük bir harita üret
+    inner = [row[1:-1] for row in layout[1:-1]]
+    rows = []
+    for _ in range(ny):
+        for row in inner:
+            rows.append('W' + row * nx + 'W')
+    rows = ['W' * len(rows[0])] + rows + ['W' * len(rows[0])]
+    # Tek Pacman kalsın
+    seen = False
+    for i, row in enumerate(rows):
+        while 'P' in row:
+            if seen: row = row.replace('P', '.', 1)
+            else: row = row.replace('P', '@', 1); seen = True
+        rows[i] = row.replace('@', 'P')
+    return rows
+
+
+MAPS = {
+    'stock': lambda: list(pacman.MAP_LAYOUT),
+    'large': lambda: tiled_layout(pacman.MAP_LAYOUT, 3, 3),
+    'xl': lambda: tiled_layout(pacman.MAP_LAYOUT, 6, 6),
+    'maze201': lambda: pacman.generate_maze(201, 201, seed=0),  # Tablosuz: kavşak grafı
+}
+
+
+def midgame(layout, ticks=600, seed=1):
+    # Gerçekçi bir oyun ortası durumu (yemlerin bir kısmı yenmiş)
+    sim = pacman.Simulation('AI', seed=seed, layout=layout)
+    for _ in range(ticks):
+        if sim.game_over: break
+        sim.step()
+    if sim.game_over:
+        sim = pacman.Simulation('AI', seed=seed, layout=layout)
+    return sim
+
+
+def bench_get_move(layout):
+    sim = midgame(layout)
+    return lambda: sim.pacman.get_move(sim)
+
+
+def bench_path_utility(layout):
+    sim = midgame(layout)
+    cells = sim.maze.cells
+    state = {'i': 0}
+
+    def call():
+        state['i'] = (state['i'] + 1) % len(cells)
+        sim.pacman.calculate_path_utility(cells[state['i']], sim.pellet_grid, layout)
+    return call
+
+
+def _chase_bench(layout, first_step):
+    maze = pacman.compile_maze(layout)
+    cells = maze.cells
+    state = {'i': 0}
+
+    def call():
+        i = state['i'] = (state['i'] + 7) % len(cells)
+        first_step(maze, cells[i], cells[(i * 31) % len(cells)])
+    return call
+
+
+def _bfs_first_step(maze, pos, target_pos):
+    # Hücre düzeyinde BFS, hedefe varınca durur (derlenmiş tabloyla karşılaştırma için)
+    start, target = maze.index[pos], maze.index[target_pos]
+    if start == target: return (0, 0)
+    dist, _, first = maze.bfs([start], stop=lambda i: i == target, first_steps=True)
+    return None if dist[target] == pacman.NO_PATH else pacman.DIRECTIONS[first[target]]
+
+
+def bench_bfs_chase(layout):
+    return _chase_bench(layout, pacman.CompiledMaze.first_step)
+
+
+def bench_bfs_uncached(layout):
+    return _chase_bench(layout, _bfs_first_step)
+
+
+SWARM = 100  # Sürü benchmark'ındaki hayalet sayısı
+
+
+def bench_ghost_swarm(layout):
+    # 100 hayalet aynı adımda Pacman'e kovalar (GhostManager.step); Pacman 13 çağrıda bir hücre değiştirir
+    sim = midgame(layout)
+    cells = sim.maze.cells
+    rnd = random.Random(0)
+    mgr = pacman.GhostManager(sim.maze, rnd)
+    for k in range(SWARM): mgr.add(*rnd.choice(cells), pacman.RED, k)
+    due = [pacman.GHOST_MOVE_MS] * SWARM
+    state = {'i': 0}
+
+    def call():
+        i = state['i'] = state['i'] + 1
+        target = cells[(i // 13) * 7 % len(cells)]
+        sim.chase_field.set_source(sim.maze.index[target])
+        mgr.timer[:] = due  # Her çağrıda hareket etsin
+        mgr.step(sim.time_ms, pacman.SIM_DT, sim.chase_field)
+    return call
+
+
+def bench_load_map(layout):
+    # Game.load_map: Simulation, karar işçisi, duvar katmanı ve arka plan (harita derlemesi önbellekte)
+    game = pacman.Game(sound=False, layout=layout)
+    game.mode = 'AI'
+    game.load_map()
+    return game.load_map
+
+
+def bench_compile_cold(layout):
+    # Soğuk derleme: süreç içi önbellek ve geçici disk önbelleği her çağrıda boş,
+    # APSP tabloları baştan kurulup diske yazılır. Büyük haritada saniyeler sürer.
+    layout = tuple(layout)
+    cache = tempfile.TemporaryDirectory(prefix='pacman_bench_')
+
+    def call():
+        pacman._COMPILED_MAZES.pop(layout, None)
+        for name in os.listdir(cache.name): os.remove(os.path.join(cache.name, name))
+        original = pacman.MAZE_CACHE_DIR
+        pacman.MAZE_CACHE_DIR = cache.name
+        try:
+            pacman.compile_maze(layout)
+        finally:
+            pacman.MAZE_CACHE_DIR = original
+    call.min_calls = 3
+    return call
+
+
+def bench_collision(layout):
+    sim = midgame(layout)
+    # Pacman her çağrıda farklı bir hücrede; yenen yem bir sonraki çağrıdan önce,
+    # ölçüm dışında (prepare) geri konur: geri koymanın yem alanı BFS'i sayılmaz
+    cells = sim.maze.cells
+    state = {'i': 0, 'eaten': None}
+    width = sim.grid_width
+
+    def prepare():
+        if state['eaten']: sim.place_pellet(*state['eaten'])
+        i = state['i'] = (state['i'] + 1) % len(cells)
+        x, y = cells[i]
+        sim.pacman.grid_pos = [x, y]
+        kind = sim.pellet_grid[y * width + x]
+        state['eaten'] = (x, y, kind) if kind else None
+        sim.events.clear()
+
+    def call():
+        sim.eat_pellets()
+    call.prepare = prepare
+    return call
+
+
+def bench_draw(layout):
+    game = pacman.Game(sound=False, layout=layout)
+    game.mode = 'AI'
+    game.load_map()
+    game.sim = midgame(layout)
+    game.build_background()
+    return game.draw
+
+
+BENCHMARKS = {
+    'get_move': bench_get_move,
+    'calculate_path_utility': bench_path_utility,
+    'bfs_chase': bench_bfs_chase,
+    'bfs_chase_uncached': bench_bfs_uncached,
+    'ghost_swarm': bench_ghost_swarm,
+    'load_map': bench_load_map,
+    'compile_cold': bench_compile_cold,
+    'collision': bench_collision,
+    'draw': bench_draw,
+}
+
+
+def measure(call, min_time=0.5, min_calls=50, max_calls=200000):
+    # Her çağrı ayrı zamanlanır; ısınma turu sonuçlara katılmaz.
+    # Yavaş benchmark'lar call.min_calls ile daha az çağrı isteyebilir;
+    # call.prepare varsa her çağrıdan önce ölçüm dışında çalışır (durumu geri kurmak için)
+    min_calls = getattr(call, 'min_calls', min_calls)
+    prepare = getattr(call, 'prepare', None)
+    for _ in range(min(10, min_calls)):
+        if prepare: prepare()
+        call()
+    samples = []
+    clock = time.perf_counter_ns
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_calls and (len(samples) < min_calls or time.perf_counter() < deadline):
+        if prepare: prepare()
+        t0 = clock()
+        call()
+        samples.append(clock() - t0)
+    samples.sort()
+    n = len(samples)
+    total = sum(samples)
+
+    def pct(p): return samples[min(n - 1, int(p / 100 * n))] / 1000  # µs
+    return {
+        'calls': n,
+        'ops_per_sec': n / (total / 1e9) if total else float('inf'),
+        'p50_us': pct(50),
+        'p95_us': pct(95),
+        'p99_us': pct(99),
+    }
+
+
+def run(names, maps, min_time):
+    results = {}
+    for map_name in maps:
+        layout = MAPS[map_name]()
+        for name in names:
+            key = f"{name}@{map_name}"
+            results[key] = measure(BENCHMARKS[name](layout), min_time=min_time)
+            r = results[key]
+            print(f"{key:<34} {r['ops_per_sec']:>12.1f} ops/s   p50 {r['p50_us']:>10.1f}µs"
+                  f"   p95 {r['p95_us']:>10.1f}µs   p99 {r['p99_us']:>10.1f}µs")
+    return results
+
+
+def compare(results, baseline, threshold):
+    # p50 baseline'dan threshold oranından fazla yavaşladıysa gerileme
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if not base: continue
+        ratio = r['p50_us'] / base['p50_us'] if base['p50_us'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append((key, base['p50_us'], r['p50_us'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pacman motoru sıcak yol benchmark'ları")
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help="Virgülle ayrılmış benchmark adları")
+    parser.add_argument('--maps', default='stock,large', help=f"Haritalar ({', '.join(MAPS)})")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Benchmark başına en az ölçüm süresi (s)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON dosyası")
+    parser.add_argument('--save', action='store_true', help="Sonuçları baseline olarak kaydet")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="İzin verilen p50 yavaşlama oranı (0.25 = %%25)")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.only.split(',') if n]
+    maps = [m for m in args.maps.split(',') if m]
+    for n in names:
+        if n not in BENCHMARKS: parser.error(f"bilinmeyen benchmark: {n}")
+    for m in maps:
+        if m not in MAPS: parser.error(f"bilinmeyen harita: {m}")
+
+    results = run(names, maps, args.min_time)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f: baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f: json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline kaydedildi: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline yok ({args.baseline}); karşılaştırma atlandı. Kaydetmek için --save")
+        return 0
+    with open(args.baseline) as f: baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for key, base, now, ratio in regressions:
+        print(f"GERILEME {key}: p50 {base:.1f}µs -> {now:.1f}µs (x{ratio:.2f})")
+    if regressions: return 1
+    print(f"Gerileme yok (eşik %{args.threshold * 100:.0f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,26 @@
-import pygame
 import math
 import random
-import time
 import wave
 import struct
 import os
+import io
+import sys
+import importlib
+import mmap
+import time
+import json
+import hashlib
+import heapq
+import copy
+import csv
+import queue
+import threading
+from array import array
+from collections import deque, OrderedDict
+from itertools import chain, compress
+from functools import reduce, lru_cache
+from operator import xor
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 # =============================================================================
 # MODÜL 1: AYARLAR VE YARDIMCI FONKSİYONLAR
@@ -56,29 +72,767 @@ MAP_LAYOUT = [
 ]
 
 
-def create_beep_sound():
-    filename = "beep.wav"
-    if not os.path.exists(filename):
-        duration = 0.05
-        frequency = 440.0
-        sample_rate = 44100
-        n_samples = int(sample_rate * duration)
-        with wave.open(filename, 'w') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(sample_rate)
-            for i in range(n_samples):
-                value = int(32767.0 * 0.5 * math.sin(2.0 * math.pi * frequency * i / sample_rate))
-                data = struct.pack('<h', value)
-                wav_file.writeframes(data)
+class LazyModule:
+    # İlk özellik erişiminde içe aktarılan modül: headless simülasyon, turnuva
+    # işçileri ve tune.py pygame'i hiç yüklemez. İçe aktarınca modül global
+    # ismin yerine geçer, sonraki erişimler doğrudan modüle gider.
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+
+pygame = LazyModule('pygame')
+
+# --- SES ---
+# Efektler bellekte sentezlenir (diske wav yazılmaz/okunmaz): olay -> (başlangıç Hz, bitiş Hz, süre s)
+SOUND_TONES = {
+    'eat': (440.0, 440.0, 0.05),      # Yem
+    'energy': (330.0, 880.0, 0.15),   # Enerji topu: yükselen
+    'ghost': (1200.0, 300.0, 0.2),    # Hayalet yendi: alçalan
+}
+SOUND_PRIORITY = ('ghost', 'energy', 'eat')  # Aynı karede birden fazla olay varsa çalınan
+SOUND_RATE = 44100
+SOUND_VOLUME = 0.2
+
+
+@lru_cache(maxsize=None)
+def synth_tone(start_hz, end_hz, duration, rate=SOUND_RATE):
+    # Doğrusal frekans taramalı sinüs, 16 bit mono WAV baytları (tek tampon).
+    # Faz kapalı formda: phi(i) = 2π (f0 i / r + (f1 - f0) i² / (2 N r))
+    n = int(rate * duration)
+    a = 2.0 * math.pi * start_hz / rate
+    b = math.pi * (end_hz - start_hz) / (n * rate)
+    amp = 32767.0 * 0.5
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        i = np.arange(n, dtype=np.float64)
+        frames = (amp * np.sin(i * (a + b * i))).astype('<i2').tobytes()  # astype sıfıra doğru keser (int() gibi)
+    else:
+        # NumPy yoksa örnekler tek tek hesaplanır
+        samples = array('h', [int(amp * math.sin(i * (a + b * i))) for i in range(n)])
+        if sys.byteorder == 'big': samples.byteswap()
+        frames = samples.tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(frames)
+    return buf.getvalue()
+
+
+class SoundBank:
+    # Olay adı -> pygame.mixer.Sound, mixer açılınca bellekteki WAV'dan kurulur
+    # (oyun sırasında ilk yemde sentez/NumPy yüklemesi yüzünden takılma olmaz).
+    # Ses kapalıysa (veya mixer açılamazsa) mixer başlatılmaz, hiçbir şey sentezlenmez.
+    def __init__(self, enabled=True, volume=SOUND_VOLUME):
+        self.volume = volume
+        self.sounds = {}
+        self.enabled = enabled
+        if enabled:
+            try:
+                pygame.mixer.init()
+            except (pygame.error, NotImplementedError):  # Ses cihazı veya mixer modülü yok
+                self.enabled = False
+            else:
+                for name in SOUND_TONES: self.get(name)
+
+    def get(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            sound = pygame.mixer.Sound(file=io.BytesIO(synth_tone(*SOUND_TONES[name])))
+            sound.set_volume(self.volume)
+            self.sounds[name] = sound
+        return sound
+
+    def play_events(self, events):
+        # events: adımlarda görülen olaylar; en öncelikli olanın sesi çalınır
+        if not self.enabled: return
+        for name in SOUND_PRIORITY:
+            if name in events:
+                self.get(name).play()
+                return
+
+
+class FrameProfiler:
+    # Kare başına faz süreleri (ms) sabit boyutlu halka tamponda tutulur.
+    # Kapalıyken motorda sadece "profiler is None" kontrolü kalır.
+    PHASES = ('input', 'decision', 'ghosts', 'collision', 'draw')
+
+    def __init__(self, size=600, trace_limit=200000):
+        self.size = size
+        self.samples = {p: array('d', [0.0]) * size for p in self.PHASES}
+        self.frame = dict.fromkeys(self.PHASES, 0.0)
+        self.pos = 0
+        self.count = 0
+        self.origin = time.perf_counter()
+        # Chrome trace ('X' olayları); en eski olaylar atılır
+        self.trace = deque(maxlen=trace_limit) if trace_limit else None
+
+    clock = staticmethod(time.perf_counter)
+
+    def add(self, phase, start):
+        end = time.perf_counter()
+        self.frame[phase] += (end - start) * 1000
+        if self.trace is not None:
+            self.trace.append((phase, start, end))
+
+    def end_frame(self):
+        pos = self.pos
+        for phase, value in self.frame.items():
+            self.samples[phase][pos] = value
+            self.frame[phase] = 0.0
+        self.pos = (pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def percentiles(self, phase, ps=(50, 95, 99)):
+        ordered = sorted(self.samples[phase][:self.count])
+        if not ordered: return tuple(0.0 for _ in ps)
+        return tuple(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] for p in ps)
+
+    def summary(self):
+        return {phase: self.percentiles(phase) for phase in self.PHASES}
+
+    def export_trace(self, path):
+        # chrome://tracing / Perfetto ile açılabilen JSON
+        events = [{'name': phase, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6}
+                  for phase, start, end in (self.trace or ())]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
 
 
 # =============================================================================
-# MODÜL 2: KARAKTER SINIFLARI (AGENT & GHOST)
+# MODÜL 2: DERLENMİŞ LABİRENT (ALL-PAIRS EN KISA YOL TABLOSU)
 # =============================================================================
 
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # BFS'lerdeki yön sırası
+NO_PATH = 0xFFFF
+FOOD, ENERGY = 1, 2  # Yem ızgarasındaki hücre değerleri
+MAX_TABLE_CELLS = 4096  # Bundan büyük haritalarda tablo kurulmaz (n² bellek)
+ROUTE_CACHE_SIZE = 1 << 16  # Kavşak grafı yol sonuçları (dolunca temizlenir)
+MAZE_CACHE_DIR = os.environ.get('PACMAN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pacman_ai'))
+STALE_TMP_SECONDS = 3600  # Bundan eski .tmp dosyaları yarım kalmış yazımdan kalmıştır
+
+
+def _cache_max_bytes(default_mb=256):
+    # PACMAN_CACHE_MAX_MB okunamazsa (ör. '1G') varsayılan sınır kullanılır; import bozulmaz
+    try:
+        return max(0, int(float(os.environ.get('PACMAN_CACHE_MAX_MB', default_mb)) * (1 << 20)))
+    except (ValueError, OverflowError):
+        return default_mb << 20
+
+
+MAZE_CACHE_MAX_BYTES = _cache_max_bytes()  # 4096 hücrelik tablo ~50 MB
+
+
+def prune_maze_cache(keep=None, limit=None):
+    # Disk önbelleğini sınırın altında tut: en uzun süredir kullanılmayan (mtime,
+    # okununca güncellenir) tablolar silinir. keep: az önce yazılan, silinmez.
+    limit = MAZE_CACHE_MAX_BYTES if limit is None else limit
+    try:
+        names = os.listdir(MAZE_CACHE_DIR)
+    except OSError:
+        return
+    now = time.time()
+    tables = []
+    for name in names:
+        path = os.path.join(MAZE_CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+            if name.endswith('.tmp') and now - st.st_mtime > STALE_TMP_SECONDS:
+                os.remove(path)
+            elif name.endswith('.apsp'):
+                tables.append((st.st_mtime, st.st_size, path))
+        except OSError:  # Başka bir süreç aynı anda silmiş olabilir
+            continue
+    total = sum(size for _, size, _ in tables)
+    for _, size, path in sorted(tables):
+        if total <= limit: break
+        if path == keep: continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+class CompiledMaze:
+    # Statik harita bir kez derlenir: açık hücreler 0..n-1 ile numaralanır,
+    # dist[s * n + t] iki hücre arası mesafe, step[s * n + t] ise s'den t'ye
+    # giden ilk adımın DIRECTIONS indeksidir. Kovalama adımı O(1) bakıştır.
+    def __init__(self, layout):
+        self.layout = tuple(layout)
+        self.height = len(self.layout)
+        self.width = len(self.layout[0])
+        # Önbellek anahtarı: harita içeriği + tablo formatı
+        self.key = hashlib.sha1(('apsp-v1\n' + '\n'.join(self.layout)).encode()).hexdigest()
+        self.digest = hashlib.sha1('\n'.join(self.layout).encode()).digest()  # Sadece harita (replay için)
+
+        self.cells = []  # indeks -> (x, y)
+        self.index = {}  # (x, y) -> indeks
+        for y, row in enumerate(self.layout):
+            for x, char in enumerate(row):
+                if char != 'W':
+                    self.index[(x, y)] = len(self.cells)
+                    self.cells.append((x, y))
+        self.n = len(self.cells)
+        self.flat = array('i', [y * self.width + x for x, y in self.cells])  # indeks -> y * width + x
+
+        # Komşular CSR düzeninde: i hücresinin komşuları adj_cell[adj_start[i]:adj_start[i + 1]],
+        # yönleri adj_dir'de (DIRECTIONS sırasıyla). moves[i * 4 + d]: d yönündeki hücre (duvar: -1)
+        self.adj_start = array('i', [0])
+        self.adj_cell = array('i')
+        self.adj_dir = array('b')
+        self.moves = array('i', [-1]) * (self.n * 4)
+        for i, (x, y) in enumerate(self.cells):
+            for d, (dx, dy) in enumerate(DIRECTIONS):
+                j = self.index.get((x + dx, y + dy))
+                if j is not None:
+                    self.adj_cell.append(j)
+                    self.adj_dir.append(d)
+                    self.moves[i * 4 + d] = j
+            self.adj_start.append(len(self.adj_cell))
+        # (yön, hücre) listeleri: graf kurulumu gibi BFS dışı yürüyüşler için
+        self.neighbors = [list(zip(self.adj_dir[self.adj_start[i]:self.adj_start[i + 1]],
+                                   self.adj_cell[self.adj_start[i]:self.adj_start[i + 1]])) for i in range(self.n)]
+
+        self.dead_end_depth, self.dead_end_mouth = self._dead_ends()
+        self.food_fields = OrderedDict()  # Yem ağırlıkları -> başlangıç yem alanı (FoodField.load, LRU)
+
+        self.dist = None
+        self.step = None
+        self.graph = None  # Tablo yoksa kavşak/geçit grafı
+        if self.n <= MAX_TABLE_CELLS:
+            if not self._load_tables():
+                self._build_tables()
+                self._save_tables()
+        else:
+            self.graph = CorridorGraph(self)
+
+    def _dead_ends(self):
+        # Çıkmaz derinliği: döngüsü olan çekirdeğe (yapraklar soyulunca kalan
+        # hücreler) uzaklık; çekirdek hücreleri 0. Döngüsüz haritada hepsi 0.
+        # Ağız: hücrenin bağlı olduğu kolun çekirdeğe değdiği hücre (çekirdekte kendisi, yoksa -1)
+        n = self.n
+        degree = [len(nbs) for nbs in self.neighbors]
+        removed = bytearray(n)
+        queue = deque(i for i in range(n) if degree[i] <= 1)
+        while queue:
+            i = queue.popleft()
+            if removed[i]: continue
+            removed[i] = 1
+            for _, j in self.neighbors[i]:
+                degree[j] -= 1
+                if degree[j] == 1 and not removed[j]: queue.append(j)
+        core = [i for i in range(n) if not removed[i]]
+        mouth = array('i', [-1]) * n
+        if not core: return array('H', [0]) * n, mouth
+        depth, order, _ = self.bfs(core)
+        for i in core: mouth[i] = i
+        for i in order:
+            for _, j in self.neighbors[i]:
+                if depth[j] == depth[i] + 1: mouth[j] = mouth[i]  # Kol ağacında tek ebeveyn
+        return depth, mouth
+
+    def bfs(self, sources, limit=NO_PATH, stop=None, first_steps=False):
+        # Ortak BFS çekirdeği (CSR komşular + deque), dosyadaki tüm yol aramaları bunu kullanır.
+        # sources: başlangıç hücreleri (çok kaynaklı); limit: bu mesafeden öteye genişleme;
+        # stop(i) True dönen ilk hücrede arama biter. first_steps: her hücreye kaynaktan
+        # hangi ilk yönle gidildiği (tek kaynaklı aramalar için).
+        # Dönüş: (dist, order, first) — dist[i] mesafe (ulaşılmadıysa NO_PATH), order BFS sırası.
+        dist = array('H', [NO_PATH]) * self.n
+        first = array('b', [-1]) * self.n if first_steps else None
+        order = []
+        queue = deque()
+        for i in sources:
+            if dist[i] == NO_PATH:
+                dist[i] = 0
+                queue.append(i)
+        start, adj, dirs = self.adj_start, self.adj_cell, self.adj_dir
+        while queue:
+            curr = queue.popleft()
+            order.append(curr)
+            if stop is not None and stop(curr): break
+            nd = dist[curr] + 1
+            if nd > limit: continue
+            lo, hi = start[curr], start[curr + 1]
+            if first is None:
+                for j in adj[lo:hi]:
+                    if dist[j] == NO_PATH:
+                        dist[j] = nd
+                        queue.append(j)
+            else:
+                # İlk halka kendi yönünü taşır, sonrakiler ebeveyninkini
+                label = first[curr]
+                for k in range(lo, hi):
+                    j = adj[k]
+                    if dist[j] == NO_PATH:
+                        dist[j] = nd
+                        first[j] = dirs[k] if label < 0 else label
+                        queue.append(j)
+        return dist, order, first
+
+    def _build_tables(self):
+        n = self.n
+        dist = array('H')
+        step = array('b')
+        for s in range(n):
+            row, _, first = self.bfs([s], first_steps=True)
+            dist.extend(row)
+            step.extend(first)
+        self.dist, self.step = dist, step
+
+    def _cache_path(self):
+        return os.path.join(MAZE_CACHE_DIR, f"{self.key}.apsp")
+
+    def _load_tables(self):
+        n = self.n
+        try:
+            with open(self._cache_path(), 'rb') as f:
+                dist = array('H')
+                dist.fromfile(f, n * n)
+                step = array('b')
+                step.fromfile(f, n * n)
+        except (OSError, EOFError):
+            return False
+        self.dist, self.step = dist, step
+        try:
+            os.utime(self._cache_path())  # LRU: kullanılan tablo en son silinir
+        except OSError:
+            pass
+        return True
+
+    def _save_tables(self):
+        # Önbellek yazılamazsa (salt okunur disk vb.) sessizce geç
+        try:
+            os.makedirs(MAZE_CACHE_DIR, exist_ok=True)
+            tmp = self._cache_path() + f".{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                self.dist.tofile(f)
+                self.step.tofile(f)
+            os.replace(tmp, self._cache_path())
+        except OSError:
+            return
+        prune_maze_cache(keep=self._cache_path())
+
+    def distance(self, a, b):
+        # Labirent mesafesi, yol yoksa None
+        i, j = self.index.get(tuple(a)), self.index.get(tuple(b))
+        if i is None or j is None: return None
+        d = self.dist[i * self.n + j] if self.dist is not None else self.graph.route(i, j)[0]
+        return None if d == NO_PATH else d
+
+    def first_step(self, start, target):
+        # start'tan target'a en kısa yolun ilk hamlesi; aynı hücredeyse (0, 0), yol yoksa None
+        i, j = self.index.get(tuple(start)), self.index.get(tuple(target))
+        if i is None or j is None: return None
+        if i == j: return (0, 0)
+        d = self.step[i * self.n + j] if self.step is not None else self.graph.route(i, j)[1]
+        return None if d < 0 else DIRECTIONS[d]
+
+
+class CorridorGraph:
+    # Tablo kurulamayan büyük haritalar için: derecesi 2 olmayan hücreler
+    # kavşak (düğüm), aralarındaki geçitler tek bir kenar olur. Yol arama on
+    # binlerce hücre yerine kavşaklar üzerinde Dijkstra ile yapılır.
+    def __init__(self, maze):
+        self.maze = maze
+        n = maze.n
+        neighbors = maze.neighbors
+        self.node_of = array('i', [-1]) * n  # hücre -> düğüm (kavşak değilse -1)
+        self.edge_of = array('i', [-1]) * n  # geçit hücresi -> kenar
+        self.offset = array('i', [0]) * n  # geçit hücresinin kenarın a ucuna uzaklığı
+        self.toward_a = array('b', [-1]) * n  # geçit hücresinden a ucuna giden yön
+        self.toward_b = array('b', [-1]) * n
+        self.nodes = []  # düğüm -> hücre
+        self.edges = []  # kenar -> (a, b, uzunluk, a'dan giriş yönü, b'den giriş yönü)
+        self.adj = []  # düğüm -> [(komşu düğüm, uzunluk, ilk yön)]
+        self.cache = {}  # i * n + j -> route(i, j); hayaletler aynı hedefe tekrar tekrar sorar
+        for i in range(n):
+            if len(neighbors[i]) != 2: self._add_node(i)
+        for a in range(len(self.nodes)):
+            for d, j in neighbors[self.nodes[a]]:
+                self._walk(a, d, j)
+        # Kavşaksız halkalar (düz döngü) hiçbir yürüyüşe girmez: bir hücresini düğüm yap
+        for i in range(n):
+            if self.node_of[i] < 0 and self.edge_of[i] < 0:
+                a = self._add_node(i)
+                self._walk(a, *neighbors[i][0])
+
+    def _add_node(self, cell):
+        self.node_of[cell] = len(self.nodes)
+        self.nodes.append(cell)
+        self.adj.append([])
+        return len(self.nodes) - 1
+
+    def _walk(self, a, d, j):
+        # a düğümünden d yönüne çıkan geçidi bir sonraki düğüme kadar yürü
+        neighbors, node_of = self.maze.neighbors, self.node_of
+        start = self.nodes[a]
+        path = []
+        prev, curr = start, j
+        while node_of[curr] < 0:
+            path.append(curr)
+            nxt = prev
+            for _, k in neighbors[curr]:
+                if k != prev: nxt = k; break
+            prev, curr = curr, nxt
+        b = node_of[curr]
+        # Her geçit bir kez eklenir (ters yönden ikinci yürüyüş atlanır)
+        if path and self.edge_of[path[0]] >= 0: return
+        if not path and b < a: return
+        back = self._direction(curr, path[-1] if path else start)
+        edge = len(self.edges)
+        length = len(path) + 1
+        self.edges.append((a, b, length, d, back))
+        self.adj[a].append((b, length, d))
+        self.adj[b].append((a, length, back))
+        for k, cell in enumerate(path):
+            self.edge_of[cell] = edge
+            self.offset[cell] = k + 1
+            self.toward_a[cell] = self._direction(cell, path[k - 1] if k else start)
+            self.toward_b[cell] = self._direction(cell, path[k + 1] if k + 1 < len(path) else curr)
+
+    def _direction(self, i, j):
+        for d, k in self.maze.neighbors[i]:
+            if k == j: return d
+        return -1
+
+    def route(self, i, j):
+        # i'den j'ye (hücre indeksleri) en kısa yol: (mesafe, ilk yön indeksi); yol yoksa (NO_PATH, -1).
+        # Eşit yollarda en küçük yön indeksi: step tablosu ve DistanceField.step_from ile aynı kural
+        if i == j: return 0, -1
+        key = i * self.maze.n + j
+        hit = self.cache.get(key)
+        if hit is not None: return hit
+        if len(self.cache) >= ROUTE_CACHE_SIZE: self.cache.clear()
+        result = self.cache[key] = self._dijkstra(i, j)
+        return result
+
+    def _dijkstra(self, i, j):
+        best, best_dir = NO_PATH, -1
+        # Hedefin bağlı olduğu düğümler: düğüm -> (kalan mesafe, düğümden giriş yönü)
+        goal = {}
+        if self.node_of[j] >= 0:
+            goal[self.node_of[j]] = (0, -1)
+        else:
+            a, b, length, da, db = self.edges[self.edge_of[j]]
+            k = self.offset[j]
+            goal[a] = (k, da)
+            if b not in goal or (length - k, db) < goal[b]: goal[b] = (length - k, db)
+        # Başlangıç: kavşaktaysa kendisi, geçitteyse iki ucu
+        heap = []
+        if self.node_of[i] >= 0:
+            heap.append((0, self.node_of[i], -1))
+        else:
+            a, b, length = self.edges[self.edge_of[i]][:3]
+            k = self.offset[i]
+            heap.append((k, a, self.toward_a[i]))
+            heap.append((length - k, b, self.toward_b[i]))
+            heapq.heapify(heap)
+            # Aynı geçit üzerindeyse doğrudan yol
+            if self.edge_of[i] == self.edge_of[j]:
+                kj = self.offset[j]
+                best, best_dir = abs(k - kj), (self.toward_a[i] if kj < k else self.toward_b[i])
+        # Yığın (mesafe, düğüm, ilk yön) sıralı: düğüm eşit yollardan en küçük ilk yönle yerleşir
+        adj = self.adj
+        dist = {}
+        while heap:
+            d, node, first = heapq.heappop(heap)
+            if d > best: break
+            if node in dist: continue
+            dist[node] = d
+            target = goal.get(node)
+            if target is not None and (d + target[0], first if first >= 0 else target[1]) < (best, best_dir):
+                best, best_dir = d + target[0], (first if first >= 0 else target[1])
+            for other, length, out in adj[node]:
+                if other not in dist:
+                    heapq.heappush(heap, (d + length, other, out if first < 0 else first))
+        return best, best_dir
+
+
+class DistanceField:
+    # Pacman'in hücresinden ters mesafe alanı: Pacman hareket edene kadar
+    # önbellekte kalır, kovalayan tüm hayaletler aynı alanı okur. Hayalet
+    # komşularından mesafesi en küçük olana gider (eşitlikte DIRECTIONS
+    # sırası). Tablolu haritalarda alan dist tablosunun satırıdır ve bu seçim
+    # step tablosundaki ilk adımla aynıdır; tablosuz haritalarda alan kavşak
+    # grafında tek Dijkstra ile kurulur, geçit hücreleri uçlardan hesaplanır.
+    def __init__(self, maze):
+        self.maze = maze
+        self.source = -1
+        self.node_dist = None  # Kavşak düğümü -> mesafe (tablosuz haritalar)
+        self.steps = {}  # Hücre -> ilk adım yönü (tablosuz haritalarda aynı hücredeki hayaletler paylaşır)
+        self.ready = False
+        self.builds = 0  # Kaç kez yeniden hesaplandı (ölçüm için)
+
+    def set_source(self, i):
+        # Hesap tembel: kaynak değişince sadece geçersiz sayılır
+        if i != self.source:
+            self.source = i
+            self.ready = False
+            self.steps = {}
+
+    def _build(self):
+        graph = self.maze.graph
+        node_dist = [NO_PATH] * len(graph.nodes)
+        src = self.source
+        if graph.node_of[src] >= 0:
+            heap = [(0, graph.node_of[src])]
+        else:
+            a, b, length = graph.edges[graph.edge_of[src]][:3]
+            k = graph.offset[src]
+            heap = [(k, a), (length - k, b)]
+            heapq.heapify(heap)
+        adj = graph.adj
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d >= node_dist[node]: continue
+            node_dist[node] = d
+            for other, length, _ in adj[node]:
+                if d + length < node_dist[other]: heapq.heappush(heap, (d + length, other))
+        self.node_dist = node_dist
+        self.ready = True
+        self.builds += 1
+
+    def distance(self, i):
+        maze = self.maze
+        if maze.dist is not None: return maze.dist[self.source * maze.n + i]
+        if not self.ready: self._build()
+        graph = maze.graph
+        node = graph.node_of[i]
+        if node >= 0: return self.node_dist[node]
+        edge = graph.edge_of[i]
+        a, b, length = graph.edges[edge][:3]
+        k = graph.offset[i]
+        d = min(self.node_dist[a] + k, self.node_dist[b] + length - k)
+        # Kaynak aynı geçitteyse doğrudan yol
+        if graph.node_of[self.source] < 0 and graph.edge_of[self.source] == edge:
+            d = min(d, abs(k - graph.offset[self.source]))
+        return d
+
+    def first_step(self, pos):
+        # maze.first_step(pos, kaynak) ile aynı sözleşme: (0, 0), None veya yön
+        i = self.maze.index.get(tuple(pos))
+        if i is None: return None
+        if i == self.source: return (0, 0)
+        d = self.step_from(i)
+        return None if d < 0 else DIRECTIONS[d]
+
+    def step_from(self, i):
+        # i hücresinden (kaynak değil) ilk adımın DIRECTIONS indeksi, yol yoksa -1
+        maze = self.maze
+        if maze.step is not None: return maze.step[i * maze.n + self.source]
+        best_dir = self.steps.get(i)
+        if best_dir is None:
+            best, best_dir = self.distance(i), -1
+            for d, j in maze.neighbors[i]:
+                dj = self.distance(j)
+                if dj < best: best, best_dir = dj, d
+            self.steps[i] = best_dir
+        return best_dir
+
+
+FOOD_DEPTH = 15  # calculate_path_utility ile aynı derinlik sınırı
+FOOD_WEIGHTS = {FOOD: 600, ENERGY: 2500}
+FOOD_FIELD_CACHE = 8  # Labirent başına saklanan başlangıç yem alanı (ağırlık seti) sayısı
+
+
+class FoodField:
+    # Her hücre için "yem potansiyeli": derinlik sınırı içindeki her yemin
+    # weight / (d + 1) ** 1.5 katkısının toplamı. Yem yenince sadece o yemin
+    # çevresindeki hücrelerden katkısı çıkarılır; baştan BFS yapılmaz.
+    def __init__(self, maze, weights=FOOD_WEIGHTS):
+        self.maze = maze
+        self.weights = weights  # Yem türü -> ağırlık (ajanın 'food'/'energy' ağırlıkları)
+        self.values = array('d', [0.0]) * maze.n
+        self.falloff = [1 / ((d + 1) ** 1.5) for d in range(FOOD_DEPTH + 1)]
+
+    def _spread(self, pos, amount):
+        # Yemden derinlik sınırına kadar BFS: maze mesafesi simetrik olduğu için
+        # hücreden yeme yapılan BFS ile aynı mesafeler bulunur.
+        dist, order, _ = self.maze.bfs([self.maze.index[tuple(pos)]], FOOD_DEPTH)
+        values, falloff = self.values, self.falloff
+        for i in order:
+            values[i] += amount * falloff[dist[i]]
+
+    def load(self):
+        # Haritadaki tüm başlangıç yemleri: yem başına BFS (harita, ağırlıklar) için bir kez
+        # yapılır, sonuç derlenmiş labirentin yanında saklanır; sonraki reset'ler diziyi kopyalar
+        cache = self.maze.food_fields
+        key = tuple(sorted(self.weights.items()))
+        values = cache.get(key)
+        if values is None:
+            layout = self.maze.layout
+            for x, y in self.maze.cells:
+                char = layout[y][x]
+                if char == '.': self.add((x, y), FOOD)
+                elif char == 'o': self.add((x, y), ENERGY)
+            cache[key] = self.values[:]
+            while len(cache) > FOOD_FIELD_CACHE: cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+            self.values = values[:]
+
+    def add(self, pos, kind):
+        self._spread(pos, self.weights[kind])
+
+    def remove(self, pos, kind):
+        self._spread(pos, -self.weights[kind])
+
+    def value(self, pos):
+        return self.values[self.maze.index[tuple(pos)]]
+
+
+THREAT_RADIUS = 8  # Tehdit alanı bu mesafede durur (kaçış ve çıkmaz-ağzı cezaları 5'in altında başlar)
+
+
+def ghost_field(maze, sources, limit=NO_PATH):
+    # Çok kaynaklı BFS: her hücrenin en yakın kaynağa labirent mesafesi.
+    # Kaynak sayısından bağımsız tek geçiş; limit'ten uzak hücreler NO_PATH kalır.
+    return maze.bfs(sources, limit)[0]
+
+
+_COMPILED_MAZES = {}
+
+
+def compile_maze(layout):
+    # Aynı harita için derlenmiş labirenti tekrar kullan
+    key = tuple(layout)
+    maze = _COMPILED_MAZES.get(key)
+    if maze is None:
+        maze = _COMPILED_MAZES[key] = CompiledMaze(key)
+    return maze
+
+
+# --- Harita dosyaları ve tohumlu labirent üretici ---
+MAP_CHARS = set('W.o PG')
+
+
+def validate_layout(layout, name='harita'):
+    if not layout: raise ValueError(f"{name}: boş harita")
+    width = len(layout[0])
+    if any(len(row) != width for row in layout):
+        raise ValueError(f"{name}: tüm satırlar aynı uzunlukta olmalı")
+    unknown = set(''.join(layout)) - MAP_CHARS
+    if unknown: raise ValueError(f"{name}: bilinmeyen karakterler {''.join(sorted(unknown))!r}")
+    if layout[0].strip('W') or layout[-1].strip('W') or any(row[0] != 'W' or row[-1] != 'W' for row in layout):
+        raise ValueError(f"{name}: haritanın kenarları duvar (W) olmalı")
+    if ''.join(layout).count('P') != 1: raise ValueError(f"{name}: haritada tek bir Pacman (P) olmalı")
+    return layout
+
+
+def load_layout(path):
+    # Metin dosyası: MAP_LAYOUT ile aynı karakterler, satır başına bir harita satırı
+    with open(path) as f:
+        rows = [line.rstrip('\r\n') for line in f]
+    while rows and not rows[-1]: rows.pop()
+    return validate_layout(rows, path)
+
+
+def save_layout(path, layout):
+    with open(path, 'w') as f:
+        f.write('\n'.join(layout) + '\n')
+
+
+def generate_maze(width, height, seed=None, ghosts=4, energies=4, braid=0.5):
+    # Tohumlu labirent: tek koordinatlı odalar arasında derinlik öncelikli
+    # (iteratif) geri izleme, sonra çıkmazların braid oranı kadarı açılarak
+    # döngü eklenir. Hayaletler ortada, Pacman onlara en uzak hücrede başlar.
+    rng = random.Random(seed)
+    width, height = max(7, width | 1), max(7, height | 1)  # Kenar duvarları için tek boyut
+    grid = [['W'] * width for _ in range(height)]
+
+    def inside(x, y): return 0 < x < width - 1 and 0 < y < height - 1
+
+    grid[1][1] = '.'
+    stack = [(1, 1)]
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in DIRECTIONS if inside(x + 2 * dx, y + 2 * dy)
+                   and grid[y + 2 * dy][x + 2 * dx] == 'W']
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        grid[y + dy][x + dx] = grid[y + 2 * dy][x + 2 * dx] = '.'
+        stack.append((x + 2 * dx, y + 2 * dy))
+
+    # Çıkmazların bir kısmını komşu odaya aç (kaçış yolları)
+    for y in range(1, height - 1, 2):
+        for x in range(1, width - 1, 2):
+            if sum(grid[y + dy][x + dx] != 'W' for dx, dy in DIRECTIONS) == 1 and rng.random() < braid:
+                walls = [(dx, dy) for dx, dy in DIRECTIONS
+                         if grid[y + dy][x + dx] == 'W' and inside(x + 2 * dx, y + 2 * dy)]
+                if walls:
+                    dx, dy = rng.choice(walls)
+                    grid[y + dy][x + dx] = '.'
+
+    # Merkeze en yakın odadan BFS: ilk hücreler hayaletlere, en uzak hücre Pacman'e
+    center = ((width // 2) | 1, (height // 2) | 1)
+    center = (min(center[0], width - 2), min(center[1], height - 2))
+    order = [center]
+    seen = {center}
+    for x, y in order:
+        for dx, dy in DIRECTIONS:
+            nxt = (x + dx, y + dy)
+            if grid[nxt[1]][nxt[0]] != 'W' and nxt not in seen:
+                seen.add(nxt)
+                order.append(nxt)
+    for x, y in order[:ghosts]: grid[y][x] = 'G'
+    px, py = order[-1]
+    grid[py][px] = 'P'
+    # Enerji topları köşelere en yakın yemlere
+    corners = [(1, 1), (width - 2, height - 2), (width - 2, 1), (1, height - 2)]
+    for cx, cy in (corners * (energies // 4 + 1))[:energies]:
+        candidates = [(abs(x - cx) + abs(y - cy), x, y) for x, y in order if grid[y][x] == '.']
+        if candidates:
+            _, x, y = min(candidates)
+            grid[y][x] = 'o'
+    return [''.join(row) for row in grid]
+
+
+# =============================================================================
+# MODÜL 3: KARAKTER SINIFLARI (AGENT & GHOST)
+# =============================================================================
+
+# Fayda ajanının ağırlıkları (get_move); tune.py bunları arar, --weights ile yüklenir
+DEFAULT_WEIGHTS = {
+    'food': FOOD_WEIGHTS[FOOD],        # Yem potansiyeline katkı (mesafeyle söner)
+    'energy': FOOD_WEIGHTS[ENERGY],    # Enerji topunun katkısı
+    'richness': 20,                    # Yem potansiyelinin çarpanı
+    'memory': 2000,                    # Yakın zamanda gidilen hücreye dönme cezası (yaş başına)
+    'compass_gate': 100,               # Fayda bunun altındaysa en yakın yeme yönel
+    'compass': 400,                    # En yakın yeme yaklaştıran yön bonusu
+    'prey': 30000,                     # Korkmuş hayalete yaklaşma (mesafeye bölünür)
+    'ghost_adjacent': 500000,          # Kovalayan hayalet 1 adımda
+    'ghost_near': 100000,              # 3 adımdan yakın
+    'ghost_far': 2000,                 # 5 adımdan yakın
+    'dead_end': 20000,                 # Hayalet çıkmazın ağzına bizden önce varabilir
+    'dead_end_tip': 1000,              # Tehlike yokken çıkmazın dibine girme
+}
+
+
+def load_weights(path):
+    # JSON nesnesi: eksik anahtarlar varsayılan kalır, bilinmeyen anahtar hatadır
+    with open(path) as f: weights = json.load(f)
+    if not isinstance(weights, dict): raise ValueError(f"{path}: ağırlık dosyası bir JSON nesnesi olmalı")
+    unknown = set(weights) - set(DEFAULT_WEIGHTS)
+    if unknown: raise ValueError(f"{path}: bilinmeyen ağırlık(lar): {', '.join(sorted(unknown))}")
+    return {k: float(v) for k, v in weights.items()}
+
+
 class PacmanAgent:
-    def __init__(self, x, y):
+    def __init__(self, x, y, weights=None):
+        self.weights = DEFAULT_WEIGHTS if weights is None else {**DEFAULT_WEIGHTS, **weights}
         self.grid_pos = [x, y]
         self.pixel_pos = [x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE + CELL_SIZE // 2]
         self.direction = (0, 0)  # (dx, dy)
@@ -110,16 +864,24 @@ class PacmanAgent:
     def draw(self, screen):
         self.update_animation()
         cx, cy = self.grid_pos[0] * CELL_SIZE + CELL_SIZE // 2, self.grid_pos[1] * CELL_SIZE + CELL_SIZE // 2
+        self.draw_shape(screen, cx, cy, *self.sprite_key())
+
+    def sprite_key(self):
+        # Görüntüyü belirleyen durum (sprite önbelleği anahtarı)
+        return self.rotation, self.mouth_open
+
+    @staticmethod
+    def draw_shape(screen, cx, cy, rotation, mouth_open):
         radius = CELL_SIZE // 2 - 2
 
         # 1. Sarı Gövde
         pygame.draw.circle(screen, YELLOW, (cx, cy), radius)
 
         # 2. Ağız
-        if self.mouth_open > 0:
+        if mouth_open > 0:
 
-            start_angle = math.radians(self.rotation - self.mouth_open)
-            end_angle = math.radians(self.rotation + self.mouth_open)
+            start_angle = math.radians(rotation - mouth_open)
+            end_angle = math.radians(rotation + mouth_open)
 
             p1 = (cx + radius * math.cos(start_angle), cy - radius * math.sin(start_angle))
             p2 = (cx + radius * math.cos(end_angle), cy - radius * math.sin(end_angle))
@@ -130,128 +892,125 @@ class PacmanAgent:
         eye_x, eye_y = cx, cy
         eye_offset = radius * 0.5
 
-        if self.rotation == 0:
+        if rotation == 0:
             eye_x, eye_y = cx + 2, cy - eye_offset
-        elif self.rotation == 180:
+        elif rotation == 180:
             eye_x, eye_y = cx - 2, cy - eye_offset
-        elif self.rotation == 90:
+        elif rotation == 90:
             eye_x, eye_y = cx - eye_offset, cy - 2
-        elif self.rotation == 270:
+        elif rotation == 270:
             eye_x, eye_y = cx + eye_offset, cy - 2
 
         pygame.draw.circle(screen, BLACK, (int(eye_x), int(eye_y)), 3)
 
+    def clone(self):
+        # Karar için bağımsız kopya: get_move'un değiştirdiği durum (konum, hafıza) kopyalanır
+        other = copy.copy(self)
+        other.grid_pos = self.grid_pos[:]
+        other.memory = self.memory[:]
+        return other
+
     # UTILITY AI MANTIĞI
     def get_valid_moves(self, pos, layout):
-        x, y = pos
-        moves = []
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= ny < len(layout) and 0 <= nx < len(layout[0]):
-                if layout[ny][nx] != 'W':
-                    moves.append((dx, dy))
-        return moves
-
-    def calculate_path_utility(self, start_pos, foods, energies, layout):
-        queue = [(start_pos[0], start_pos[1], 0)]
-        visited = {tuple(start_pos)}
+        maze = compile_maze(layout)
+        i = maze.index.get(tuple(pos))
+        if i is None: return []
+        return [DIRECTIONS[d] for d in maze.adj_dir[maze.adj_start[i]:maze.adj_start[i + 1]]]
+
+    def calculate_path_utility(self, start_pos, pellet_grid, layout):
+        # pellet_grid: hücre başına yem türü (y * genişlik + x), bkz. Simulation
+        maze = compile_maze(layout)
+        dist, order, _ = maze.bfs([maze.index[tuple(start_pos)]], FOOD_DEPTH)
         total_score = 0
-        MAX_DEPTH = 15
-
-        while queue:
-            cx, cy, dist = queue.pop(0)
-            if dist > MAX_DEPTH: continue
-
-            curr_rect = pygame.Rect(cx * CELL_SIZE, cy * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            for f in foods:
-                if curr_rect.colliderect(f): total_score += 600 / ((dist + 1) ** 1.5)
-            for e in energies:
-                if curr_rect.colliderect(e): total_score += 2500 / ((dist + 1) ** 1.5)
-
-            for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                if 0 <= ny < len(layout) and 0 <= nx < len(layout[0]):
-                    if layout[ny][nx] != 'W' and (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        queue.append((nx, ny, dist + 1))
+        flat = maze.flat
+        food, energy = self.weights['food'], self.weights['energy']
+        for i in order:
+            kind = pellet_grid[flat[i]]
+            if kind == FOOD: total_score += food / ((dist[i] + 1) ** 1.5)
+            elif kind == ENERGY: total_score += energy / ((dist[i] + 1) ** 1.5)
         return total_score
 
     def get_move(self, game_obj):
 
         x, y = self.grid_pos
-        valid_moves = self.get_valid_moves((x, y), MAP_LAYOUT)
+        layout = game_obj.layout
+        valid_moves = self.get_valid_moves((x, y), layout)
         if not valid_moves: return 0, 0
 
         best_move = None
         max_utility = -float('inf')
-
-        are_ghosts_scared = False
-
-        # Global Pusula
+        w = self.weights
+
+        # Hayalet alanları (karar başına bir kez, hayalet sayısından bağımsız):
+        # kovalayanlara ve yenebilecek korkmuş hayaletlere labirent mesafesi.
+        # Kaynaklar dolu hücrelerdir; aynı hücredeki hayaletler tek kaynak sayılır
+        maze = game_obj.maze
+        index = maze.index
+        threat = ghost_field(maze, game_obj.ghost_manager.chaser_cells(), THREAT_RADIUS)
+        prey_cells = game_obj.ghost_manager.prey_cells()
+        prey = ghost_field(maze, prey_cells) if prey_cells else None
+
+        # Global Pusula (sadece yakında yem yoksa gerekir, o zaman hesaplanır)
         nearest_food = None
-        min_dist = float('inf')
-        targets = game_obj.foods + game_obj.energies
-        if targets:
-            for t in targets:
-                tx, ty = t.x // CELL_SIZE, t.y // CELL_SIZE
-                d = abs(x - tx) + abs(y - ty)
-                if d < min_dist: min_dist, nearest_food = d, (tx, ty)
+        compass_ready = False
 
         for dx, dy in valid_moves:
             nx, ny = x + dx, y + dy
             u = 0
 
             # 1. Zenginlik
-            u += self.calculate_path_utility((nx, ny), game_obj.foods, game_obj.energies, MAP_LAYOUT) * 20
+            # calculate_path_utility ile aynı değer, artımlı tutulan alandan okunur
+            u += game_obj.food_field.value((nx, ny)) * w['richness']
 
             # 2. Hafıza
             if (nx, ny) in self.memory:
                 idx = self.memory.index((nx, ny))
-                u -= (len(self.memory) - idx) * 2000
+                u -= (len(self.memory) - idx) * w['memory']
 
             # 3. Pusula
-            if u < 100 and nearest_food:
+            if u < w['compass_gate'] and not compass_ready:
+                min_dist = float('inf')
+                for tx, ty in chain(game_obj.foods, game_obj.energies):
+                    d = abs(x - tx) + abs(y - ty)
+                    if d < min_dist: min_dist, nearest_food = d, (tx, ty)
+                compass_ready = True
+            if u < w['compass_gate'] and nearest_food:
                 curr_d = abs(x - nearest_food[0]) + abs(y - nearest_food[1])
                 new_d = abs(nx - nearest_food[0]) + abs(ny - nearest_food[1])
-                if new_d < curr_d: u += 400
-
-            min_ghost_dist = float('inf')  # En yakın hayalet için
-
-            # 4. Hayaletler
-            for ghost in game_obj.ghosts:
-                gx, gy = ghost.grid_pos
-                d_ghost = abs(nx - gx) + abs(ny - gy)
-
-                if not ghost.is_scared and d_ghost < min_ghost_dist:
-                    min_ghost_dist = d_ghost
-
-
-                if ghost.is_scared:
-                    if not ghost.is_scaringOver:
-                        if d_ghost == 0:
-                            u += 10000000
-                        else:
-                            # Mesafeye bölerek yaklaştıran yönü seç
-                            u += 30000 / d_ghost
-                else:
-                    # Normal hayaletse kaç
-                    if d_ghost <= 1:
-                        u -= 500000
-                    elif d_ghost < 3:
-                        u -= 100000
-                    elif d_ghost < 5:
-                        u -= 2000
-
-            # 5. Duvar Kontrolü
-            walls = 0
-            for wx, wy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                if MAP_LAYOUT[ny + wy][nx + wx] == 'W': walls += 1
-            if walls>= 2 and not are_ghosts_scared:
-                if min_ghost_dist < 5:  # Hayalet yakındaysa
-                    u -= 20000
-                else:
-                    # Hayalet yoksa bile çıkmaz sokağa girme
-                    if walls == 3: u -= 1000
+                if new_d < curr_d: u += w['compass']
+
+            cell = index[(nx, ny)]
+
+            # 4. Hayaletler (en yakın hayaletin labirent mesafesi)
+            min_ghost_dist = threat[cell]
+            if prey:
+                d_prey = prey[cell]
+                if d_prey == 0:
+                    u += 10000000
+                elif d_prey != NO_PATH:
+                    # Mesafeye bölerek yaklaştıran yönü seç
+                    u += w['prey'] / d_prey
+
+            # Normal hayaletse kaç
+            if min_ghost_dist <= 1:
+                u -= w['ghost_adjacent']
+            elif min_ghost_dist < 3:
+                u -= w['ghost_near']
+            elif min_ghost_dist < 5:
+                u -= w['ghost_far']
+
+            # 5. Çıkmaz sokak (döngüsü olmayan kola girmek kaçış yolunu kapatır)
+            # Hayalet çıkmazın ağzına bizden önce varabilir: dışarıdaki hayaletin hücreye
+            # mesafesi ağıza mesafesi + derinlik olduğundan kural ağızda 5'ten yakın hayalettir.
+            # Ağız her zaman tehdit alanının içinde; derin çıkmazda hücre alanın dışında kalabilir.
+            depth = maze.dead_end_depth[cell]
+            if depth:
+                mouth = maze.dead_end_mouth[cell]
+                if min_ghost_dist < 5 + depth or (mouth >= 0 and threat[mouth] < 5):
+                    u -= w['dead_end']
+                elif len(maze.neighbors[cell]) == 1:
+                    # Hayalet yoksa bile çıkmazın dibine girme
+                    u -= w['dead_end_tip']
 
             if u > max_utility:
                 max_utility = u
@@ -265,38 +1024,89 @@ class PacmanAgent:
         return 0, 0
 
 
+GHOST_MOVE_MS = 250  # Kovalayan hayaletin iki hamlesi arası
+SCARED_MOVE_MS = 400  # Korkunca yavaşlar
+SCARE_MS = 8000  # Enerji topunun korku süresi
+SCARE_BLINK_MS = 6000  # Bundan sonra yanıp söner (korku bitmek üzere)
+
+
+def random_step(moves, i, shuffle):
+    # Korku/kaçış hamlesi: yönleri karıştır, ilk açık olana git (-1: çıkış yok).
+    # Simulation ve GameState aynı fonksiyonu kullanır, RNG aynı sırayla çekilir.
+    order = [0, 1, 2, 3]
+    shuffle(order)
+    base = i * 4
+    for d in order:
+        if moves[base + d] >= 0: return d
+    return -1
+
+
 class Ghost:
-    def __init__(self, x, y, color):
-        self.grid_pos = [x, y]
+    # GhostManager'daki bir hayaletin görünümü: renderer, ajanlar, replay ve
+    # telemetri hayaleti buradan okur. Konum, zamanlayıcı, yön ve korku durumu
+    # yöneticinin dizilerinde; slot bu hayaletin dizi indeksidir.
+    __slots__ = ('manager', 'slot', 'id', 'color', 'spawn', 'lives')
+
+    def __init__(self, manager, slot, gid, color, spawn):
+        self.manager = manager
+        self.slot = slot
+        self.id = gid  # Haritadaki sırası (yenen hayaletler listeden çıksa da sabit)
         self.color = color
-        self.timer = 0
-        self.move_interval = 250  # ms
-        self.is_scared = False
-        self.is_scaringOver = False
-        self.scared_timer = 0
-        self.direction = (0, 0)
+        self.spawn = spawn  # Yenip canı kalırsa döneceği hücre
         self.lives = 1
 
-    def make_scared(self):
-        self.is_scared = True
-        self.scared_timer = pygame.time.get_ticks()
+    @property
+    def cell(self):
+        return self.manager.cell[self.slot]
 
-    def update(self):
-        # Korku süresi kontrolü (8 Saniye)
-        if self.is_scared:
-            if pygame.time.get_ticks() - self.scared_timer > 8000:
-                self.is_scared = False
+    @property
+    def grid_pos(self):
+        return list(self.manager.maze.cells[self.manager.cell[self.slot]])
 
-    def draw(self, screen):
+    @grid_pos.setter
+    def grid_pos(self, pos):
+        self.manager.place(self, self.manager.maze.index[tuple(pos)])
+
+    @property
+    def timer(self):
+        return self.manager.timer[self.slot]
+
+    @property
+    def direction(self):
+        d = self.manager.heading[self.slot]
+        return DIRECTIONS[d] if d >= 0 else (0, 0)
+
+    @property
+    def last_move(self):
+        # Son adımda yapılan hamle (replay kaydı için), yoksa None
+        m, k = self.manager, self.slot
+        return DIRECTIONS[m.heading[k]] if m.moved_at[k] == m.ticks else None
+
+    @property
+    def is_scared(self):
+        return bool(self.manager.scared[self.slot])
+
+    @property
+    def is_scaringOver(self):
+        return bool(self.manager.scaring_over[self.slot])
+
+    @property
+    def scared_timer(self):
+        return self.manager.scared_since[self.slot]
+
+    def draw(self, screen, now):
         cx, cy = self.grid_pos[0] * CELL_SIZE + CELL_SIZE // 2, self.grid_pos[1] * CELL_SIZE + CELL_SIZE // 2
+        self.draw_shape(screen, cx, cy, *self.sprite_key(now))
 
+    def sprite_key(self, now):
         # Renk Belirleme
-        draw_color = SCARED_BLUE if self.is_scared else self.color
-        if self.is_scared and (pygame.time.get_ticks() // 200) % 2 == 0 and (
-                pygame.time.get_ticks() - self.scared_timer > 6000):
-            draw_color = WHITE  # Sonlara doğru yanıp sönme efekti
-            self.is_scaringOver = True
+        m, k = self.manager, self.slot
+        if not m.scared[k]: return self.color, self.direction, False
+        blink = m.scaring_over[k] and (now // 200) % 2 == 0  # Sonlara doğru yanıp sönme efekti
+        return WHITE if blink else SCARED_BLUE, self.direction, True
 
+    @staticmethod
+    def draw_shape(screen, cx, cy, draw_color, direction, scared):
         # 1. Kafa
         radius = CELL_SIZE // 2 - 2
         pygame.draw.circle(screen, draw_color, (cx, cy - 4), radius)
@@ -324,340 +1134,1940 @@ class Ghost:
         pygame.draw.circle(screen, WHITE, (cx + eye_offset_x, cy + eye_offset_y), eye_radius)
 
         # Göz Bebekleri (Yöne göre kayar)
-        p_dx, p_dy = self.direction[0] * 2, self.direction[1] * 2
+        p_dx, p_dy = direction[0] * 2, direction[1] * 2
         pupil_color = BLUE
-        if self.is_scared:
+        if scared:
             pupil_color = WHITE
             p_dx, p_dy = 0, 0
 
         pygame.draw.circle(screen, pupil_color, (cx - eye_offset_x + p_dx, cy + eye_offset_y + p_dy), pupil_radius)
         pygame.draw.circle(screen, pupil_color, (cx + eye_offset_x + p_dx, cy + eye_offset_y + p_dy), pupil_radius)
 
-    def bfs_chase(self, target_pos, layout):
-        # BFS ile hedefi (Pacman) bul ve ilk adımı döndür
-        start = tuple(self.grid_pos)
-        target = tuple(target_pos)
 
-        queue = [start]
-        # Her dügümün nereden gelindigini tutar: parent[child] = parent
-        parents = {start: None}
+class GhostManager:
+    # Hayalet sürüsü: konum (hücre indeksi), zamanlayıcı, yön ve korku
+    # bayrakları paralel listelerde tutulur; step() tüm hayaletleri tek döngüde
+    # ilerletir ve Ghost nesnelerine dokunmaz. (array.array her okumada yeni
+    # int/float nesnesi üretir, düz listeler bu döngüde yaklaşık iki kat hızlı.)
+    # Hayalet kurallarının tek kaynağı burasıdır: GameState aynı sabitleri ve
+    # random_step'i, BatchSimulation aynı sabitleri kullanır. occupancy hücre ->
+    # hayaletler haritasıdır; hareketten sonraki ilk sorguda dizilerden bir kez kurulur.
+    def __init__(self, maze, rng=random):
+        self.maze = maze
+        self.rng = rng
+        self.ghosts = []  # Ghost; liste sırası = slot sırası
+        self.cell = []
+        self.timer = []
+        self.heading = []  # Son hamlenin DIRECTIONS indeksi (-1: yerinde)
+        self.moved_at = []  # Son hamlenin yapıldığı adım (last_move için)
+        self.scared = []
+        self.scaring_over = []
+        self.scared_since = []
+        self.ticks = 0
+        self._occupancy = {}
+
+    def __len__(self):
+        return len(self.ghosts)
+
+    def add(self, x, y, color, gid):
+        g = Ghost(self, len(self.ghosts), gid, color, (x, y))
+        self.ghosts.append(g)
+        self.cell.append(self.maze.index[(x, y)])
+        self.timer.append(0)
+        self.heading.append(-1)
+        self.moved_at.append(-1)
+        self.scared.append(0)
+        self.scaring_over.append(0)
+        self.scared_since.append(0)
+        self._occupancy = None
+        return g
+
+    @property
+    def occupancy(self):
+        # Hücre -> o hücredeki hayaletler (slot sırasıyla)
+        occ = self._occupancy
+        if occ is None:
+            occ = self._occupancy = {}
+            for g, i in zip(self.ghosts, self.cell):
+                bucket = occ.get(i)
+                if bucket is None: occ[i] = [g]
+                else: bucket.append(g)
+        return occ
+
+    def place(self, g, i):
+        self.cell[g.slot] = i
+        self._occupancy = None
+
+    def at(self, i):
+        # i hücresindeki hayaletler, liste sırasıyla
+        if self._occupancy is None and i not in self.cell: return ()  # Haritayı kurmadan hızlı ret
+        return self.occupancy.get(i, ())
+
+    def chaser_cells(self):
+        # Kovalayan hayaletlerin bulunduğu (tekrarsız) hücreler
+        scared = self.scared
+        return [i for i, bucket in self.occupancy.items() if any(not scared[g.slot] for g in bucket)]
+
+    def prey_cells(self):
+        # Yenebilecek (korkusu bitmek üzere olmayan) hayaletlerin hücreleri
+        scared, over = self.scared, self.scaring_over
+        return [i for i, bucket in self.occupancy.items() if any(scared[g.slot] and not over[g.slot] for g in bucket)]
+
+    def scare_all(self, now):
+        n = len(self.ghosts)
+        self.scared[:] = [1] * n
+        self.scaring_over[:] = [0] * n
+        self.scared_since[:] = [now] * n
+
+    def respawn(self, g):
+        # Yenen ama canı kalan hayalet başladığı hücreye döner ve normale geçer
+        self.place(g, self.maze.index[g.spawn])
+        self.scared[g.slot] = 0
+
+    def remove(self, g):
+        k = g.slot
+        for arr in (self.cell, self.timer, self.heading, self.moved_at, self.scared, self.scaring_over,
+                    self.scared_since):
+            del arr[k]
+        del self.ghosts[k]
+        for j in range(k, len(self.ghosts)): self.ghosts[j].slot = j
+        self._occupancy = None
+
+    def step(self, now, dt, field, ghost_moves=None):
+        # Korku süresi, zamanlayıcı ve hareket; ghost_moves verilirse kayıttan oynatılır.
+        # field: Pacman'in hücresine kurulmuş ortak DistanceField
+        self.ticks += 1
+        if ghost_moves is not None: return self._replay(now, ghost_moves)
+        cell, timer, scared, over, since = self.cell, self.timer, self.scared, self.scaring_over, self.scared_since
+        heading, moved_at, tick = self.heading, self.moved_at, self.ticks
+        moves = self.maze.moves
+        table, n = self.maze.step, self.maze.n
+        source = field.source
+        shuffle = self.rng.shuffle
+        fast, slow = GHOST_MOVE_MS, SCARED_MOVE_MS
+        moved = False
+        for k in range(len(timer)):
+            s = scared[k]
+            if s:
+                elapsed = now - since[k]
+                if elapsed > SCARE_MS:
+                    scared[k] = over[k] = s = 0
+                elif elapsed > SCARE_BLINK_MS:
+                    over[k] = 1
+            t = timer[k] + dt
+            if t >= (slow if s else fast):
+                i = cell[k]
+                if s:
+                    d = random_step(moves, i, shuffle)  # Korku modu: rastgele kaçış
+                elif i == source:
+                    heading[k] = -1  # Pacman'in hücresinde: yerinde kal
+                    timer[k] = 0
+                    continue
+                else:
+                    # Kovalama: ortak alandan ilk adım; yol yoksa rastgele
+                    d = table[i * n + source] if table is not None else field.step_from(i)
+                    if d < 0: d = random_step(moves, i, shuffle)
+                if d >= 0:
+                    cell[k] = moves[i * 4 + d]
+                    heading[k] = d
+                    moved_at[k] = tick
+                    moved = True
+                t = 0
+            timer[k] = t
+        if moved: self._occupancy = None
+
+    def _replay(self, now, ghost_moves):
+        # Kayıttan gelen hamleler (None: bu adımda hareket yok); korku süresi yine saatle işler
+        cell, timer, scared, over, since = self.cell, self.timer, self.scared, self.scaring_over, self.scared_since
+        cells, index = self.maze.cells, self.maze.index
+        for k, g in enumerate(self.ghosts):
+            if scared[k]:
+                elapsed = now - since[k]
+                if elapsed > SCARE_MS:
+                    scared[k] = over[k] = 0
+                elif elapsed > SCARE_BLINK_MS:
+                    over[k] = 1
+            move = ghost_moves[g.id]
+            if move:
+                x, y = cells[cell[k]]
+                cell[k] = index[(x + move[0], y + move[1])]
+                self.heading[k] = DIRECTIONS.index(move)
+                self.moved_at[k] = self.ticks
+                timer[k] = 0
+                self._occupancy = None
+
+    def copy(self):
+        # Bağımsız kopya (karar işçisinin anlık görüntüsü için); RNG paylaşılır
+        other = copy.copy(self)
+        for name in ('cell', 'timer', 'heading', 'moved_at', 'scared', 'scaring_over', 'scared_since'):
+            setattr(other, name, getattr(self, name)[:])
+        other.ghosts = []
+        for g in self.ghosts:
+            view = copy.copy(g)
+            view.manager = other
+            other.ghosts.append(view)
+        other._occupancy = None
+        return other
 
-        found = False
-        visited = {start}
 
-        while queue:
-            curr = queue.pop(0)
-            if curr == target:
-                found = True
-                break
+# =============================================================================
+# MODÜL 4: SİMÜLASYON ÇEKİRDEĞİ (HEADLESS)
+# =============================================================================
+
+SIM_DT = 1000 / FPS  # Sabit simülasyon adımı (ms)
+MOVE_DELAYS = {'AI': 200, 'SEARCH': 200, 'HUMAN': 100}  # Pacman'in iki hamlesi arası (ms)
+SPRITE_PAD = 4  # Hayalet kafası/ayakları hücreden taşar
+
+
+class Simulation:
+    # Ekran, ses ve event pompası olmadan oyun kuralları.
+    # Tüm zamanlayıcılar simülasyon saatiyle (time_ms) ilerler.
+    def __init__(self, mode='AI', seed=None, layout=None, weights=None):
+        self.mode = mode
+        self.seed = seed  # None: global random modülü kullanılır
+        self.layout = MAP_LAYOUT if layout is None else layout
+        self.weights = weights  # Fayda ajanı ağırlıkları (None: DEFAULT_WEIGHTS)
+        self.pacman = None
+        self.ghosts = []
+        self.foods = {}  # (x, y) -> piksel merkezi; ekleme sırası korunur
+        self.energies = {}
+        self.pellets_left = 0
+        self.pellet_grid = bytearray()  # Hücre başına yem türü: 0, FOOD veya ENERGY
+        self.events = []  # Son adımda olan olaylar ('eat', 'energy', 'ghost')
+        self.profiler = None  # FrameProfiler bağlanırsa fazlar ölçülür
+        self.recorder = None  # ReplayWriter bağlanırsa her adım kaydedilir
+        self.telemetry = None  # GameTelemetry bağlanırsa oyun/adım kayıtları üretilir
+        self.reset()
+
+    def reset(self):
+        self.foods = {}
+        self.energies = {}
+        self.pellets_left = 0
+        self.grid_width = len(self.layout[0])
+        self.pellet_grid = bytearray(self.grid_width * len(self.layout))
+        self.maze = compile_maze(self.layout)
+        w = DEFAULT_WEIGHTS if self.weights is None else {**DEFAULT_WEIGHTS, **self.weights}
+        self.food_field = FoodField(self.maze, {FOOD: w['food'], ENERGY: w['energy']})
+        self.chase_field = DistanceField(self.maze)  # Hayaletlerin ortak kovalama alanı
+        self.events = []
+        self.rng = random if self.seed is None else random.Random(self.seed)
+        self.ghost_manager = GhostManager(self.maze, self.rng)
+        self.ghosts = self.ghost_manager.ghosts  # Aynı liste: hayalet silinince ikisi birlikte küçülür
+        self.score = 0
+        self.time_ms = 0
+        self.ticks = 0
+        self.move_timer = 0
+        self.last_action = None  # Son adımda Pacman'e uygulanan hamle
+        self.game_over = False
+        self.win = False
+        self.end_reason = None  # 'cleared', 'ghosts' veya 'caught'
+        self.caught_by = None  # Pacman'i yakalayan hayaletin id'si
+
+        ghost_colors = [RED, CYAN, PINK, ORANGE]
+        ghost_idx = 0
 
-            cx, cy = curr
-            for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                nx, ny = cx + dx, cy + dy
-                # Duvar kontrolü ve harita sınırı
-                if 0 <= ny < len(layout) and 0 <= nx < len(layout[0]):
-                    if layout[ny][nx] != 'W' and (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        parents[(nx, ny)] = curr
-                        queue.append((nx, ny))
-
-        if found:
-            # Backtracking: Hedefen geriye doğru gelerek ilk hamleyi bul
-            path_node = target
-            while parents[path_node] != start:
-                path_node = parents[path_node]
-                if path_node is None: return (0, 0)  # Hata durumu
-
-
-            return (path_node[0] - start[0], path_node[1] - start[1])
-
-        return None  # Yol yoksa
-
-    def move_logic(self, player_pos, layout):
-        # Zamanlayıcı
-        self.timer += 1000 / FPS  # Yaklaşık dt
-        interval = self.move_interval
-        if self.is_scared: interval = 400  # Korkunca yavaşla
-
-        if self.timer >= interval:
-            next_move = None
-
-            if self.is_scared:
-                # KORKU MODU: Rastgele kaçış
-                directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-                random.shuffle(directions)
-                for dx, dy in directions:
-                    nx, ny = self.grid_pos[0] + dx, self.grid_pos[1] + dy
-                    if layout[ny][nx] != 'W':
-                        next_move = (dx, dy)
-                        break
+        for r, row in enumerate(self.layout):
+            for c, char in enumerate(row):
+                if char == '.':
+                    self.place_pellet(c, r, FOOD, spread=False)
+                elif char == 'o':
+                    self.place_pellet(c, r, ENERGY, spread=False)
+                elif char == 'P':
+                    agent = SearchAgent if self.mode == 'SEARCH' else PacmanAgent
+                    self.pacman = agent(c, r, weights=self.weights)
+                elif char == 'G':
+                    self.ghost_manager.add(c, r, ghost_colors[ghost_idx % 4], ghost_idx)
+                    ghost_idx += 1
+        self.num_ghosts = ghost_idx  # Başlangıçtaki hayalet sayısı (id aralığı)
+        self.food_field.load()  # Başlangıç yemlerinin alanı tek seferde (önbellekten kopya)
+
+    @property
+    def elapsed_time(self):
+        return self.time_ms / 1000
+
+    def decision_due(self, dt=SIM_DT):
+        # Bir sonraki step() Pacman için karar isteyecek mi
+        return not self.game_over and self.mode != 'HUMAN' and self.move_timer + dt > MOVE_DELAYS[self.mode]
+
+    def snapshot(self, dt=SIM_DT):
+        # Karar işçisi için değişmez kopya: ajanın step() içinden göreceği durumla
+        # aynı (adım sayacı ilerlemiş, Pacman ve hayaletler henüz hareket etmemiş).
+        # Harita/derlenmiş labirent paylaşılır, değişen her şey kopyalanır.
+        snap = copy.copy(self)
+        snap.ticks += 1
+        snap.time_ms += dt
+        snap.move_timer += dt
+        snap.pellet_grid = bytes(self.pellet_grid)
+        snap.foods = dict(self.foods)
+        snap.energies = dict(self.energies)
+        snap.food_field = copy.copy(self.food_field)
+        snap.food_field.values = self.food_field.values[:]
+        snap.pacman = copy.copy(self.pacman)
+        snap.pacman.grid_pos = list(self.pacman.grid_pos)
+        snap.ghost_manager = self.ghost_manager.copy()
+        snap.ghosts = snap.ghost_manager.ghosts
+        snap.events = []
+        snap.profiler = snap.recorder = snap.telemetry = None
+        return snap
+
+    def step(self, action=None, dt=SIM_DT, ghost_moves=None):
+        # Tek simülasyon adımı. action: insan modunda basılı yön (dx, dy) veya None;
+        # AI/SEARCH modunda verilirse ajan yerine bu hamle kullanılır (replay).
+        # ghost_moves: hayalet id'si -> hamle listesi (replay), None ise kurallar
+        self.events = []
+        self.last_action = None
+        if self.game_over: return
+        self.time_ms += dt
+        self.ticks += 1
+
+        dx, dy = 0, 0
+        self.move_timer += dt
+        move_delay = MOVE_DELAYS[self.mode]  # AI Hızı / İnsan Hızı
+        prof = self.profiler
+        if self.move_timer > move_delay:
+            if self.mode != 'HUMAN' and action is None:
+                tel = self.telemetry
+                if prof or tel: t0 = time.perf_counter()
+                action = self.pacman.get_move(self)
+                if prof: prof.add('decision', t0)
+                if tel: tel.decision((time.perf_counter() - t0) * 1000)
+            if action:
+                dx, dy = action
+            self.last_action = action
+            self.move_timer = 0
+
+        if dx != 0 or dy != 0:
+            nx, ny = self.pacman.grid_pos[0] + dx, self.pacman.grid_pos[1] + dy
+            if self.layout[ny][nx] != 'W':
+                self.pacman.grid_pos = [nx, ny]
+                self.pacman.direction = (dx, dy)
+
+        # 1-2. Yemek ve enerji topu yeme
+        if prof: t0 = prof.clock()
+        self.eat_pellets()
+
+        # 3. KAZANMA KONTROLÜ
+        if self.pellets_left == 0:
+            self.game_over = True
+            self.win = True
+            self.end_reason = 'cleared'
+
+        # 4. KAZANMA KONTROLÜ
+        if not self.ghosts:
+            self.game_over = True
+            self.win = True
+            self.end_reason = 'ghosts'
+            self.score += 1000  # Bonus puan
+
+        if prof: prof.add('collision', t0)
+
+        # 5. HAYALET HAREKETİ VE CAN SİSTEMİ
+        if prof: t0 = prof.clock()
+        pac = self.maze.index[tuple(self.pacman.grid_pos)]
+        self.chase_field.set_source(pac)
+        self.ghost_manager.step(self.time_ms, dt, self.chase_field, ghost_moves)
+        if prof:
+            prof.add('ghosts', t0)
+            t0 = prof.clock()
+        # Kayıt çarpışmadan önce: bu adımda yenen hayaletin hamlesi de yazılmalı
+        if self.recorder: self.recorder.record(self)
+
+        # Çarpışma Kontrolü (hayaletler birbirini etkilemediği için hareketten sonra toplu).
+        # Sadece Pacman'in hücresindeki hayaletlere bakılır (occupancy)
+        for g in self.ghost_manager.at(pac):
+            if g.is_scared:
+                # --- HAYALET YENDİ ---
+                g.lives -= 1  # Canı azalt
+                self.score += 200  # Puan ver
+                self.events.append('ghost')
+
+                if g.lives <= 0:
+                    # Canı bittiyse sil
+                    self.ghost_manager.remove(g)
+                else:
+                    # Canı varsa başladığı hücreye (hayalet evi) ışınla, normale dön
+                    self.ghost_manager.respawn(g)
+            else:
+                # --- PACMAN ÖLDÜ ---
+                self.game_over = True
+                self.win = False
+                self.end_reason = 'caught'
+                self.caught_by = g.id
+        if prof: prof.add('collision', t0)
+        if self.telemetry: self.telemetry.on_step(self)
+
+    def place_pellet(self, x, y, kind, spread=True):
+        # Yem tüm indekslere (ızgara, hücre sözlüğü, sayaç, yem alanı) birlikte eklenir.
+        # spread=False: yem alanı sonradan FoodField.load ile toplu doldurulur (reset)
+        (self.foods if kind == FOOD else self.energies)[(x, y)] = (x * CELL_SIZE + CELL_SIZE // 2,
+                                                                  y * CELL_SIZE + CELL_SIZE // 2)
+        self.pellet_grid[y * self.grid_width + x] = kind
+        self.pellets_left += 1
+        if spread: self.food_field.add((x, y), kind)
+
+    def take_pellet(self, x, y):
+        # Hücredeki yemi kaldır, türünü döndür (yoksa 0)
+        cell = y * self.grid_width + x
+        kind = self.pellet_grid[cell]
+        if kind:
+            self.pellet_grid[cell] = 0
+            del (self.foods if kind == FOOD else self.energies)[(x, y)]
+            self.pellets_left -= 1
+            self.food_field.remove((x, y), kind)
+        return kind
+
+    def eat_pellets(self):
+        # Pacman tam olarak bir hücrede: yem kontrolü tek ızgara bakışı
+        kind = self.take_pellet(*self.pacman.grid_pos)
+
+        # 1. Yemek Yeme
+        if kind == FOOD:
+            self.score += 10
+            self.events.append('eat')
+
+        # 2. Enerji Topu Yeme
+        elif kind == ENERGY:
+            self.score += 50
+            # Tüm hayaletleri korkut
+            self.ghost_manager.scare_all(self.time_ms)
+            self.events.append('energy')
+
+    def run(self, max_time_ms=None):
+        # Render beklemeden, CPU'nun izin verdiği hızda oyunu bitir
+        while not self.game_over:
+            if max_time_ms is not None and self.time_ms >= max_time_ms: break
+            self.step()
+            if self.profiler: self.profiler.end_frame()
+        if self.telemetry: self.telemetry.finish()  # Süre dolduysa yarım kalan oyun
+        return self
+
+
+# =============================================================================
+# MODÜL 5: ARAMA İÇİN KOMPAKT OYUN DURUMU
+# =============================================================================
+# Simulation nesneleri (listeler, Ghost örnekleri, float zamanlayıcılar)
+# deepcopy için pahalı. GameState aynı kuralları tamsayı adım sayaçlarıyla
+# tutar: zamanlayıcılar "son sıfırlamadan beri geçen adım" olarak saklanır ve
+# float birikimi önceden hesaplanmış tablodan okunduğu için Simulation ile
+# aynı adımda tetiklenir. Bir apply() çağrısı bir Pacman kararından bir
+# sonrakine kadar olan adımları, sadece olay olan adımlara atlayarak işler.
+
+_TICK_TIMES = array('d', [0.0])  # _TICK_TIMES[k]: k adım boyunca dt biriktirilince oluşan süre
+
+
+def tick_time(k):
+    # Simulation'daki "timer += dt" birikimiyle birebir aynı float değer
+    while len(_TICK_TIMES) <= k:
+        _TICK_TIMES.append(_TICK_TIMES[-1] + SIM_DT)
+    return _TICK_TIMES[k]
+
+
+def ticks_until(limit, strict=False):
+    # Sıfırdan biriken zamanlayıcının limit'e ulaştığı (strict: geçtiği) ilk adım
+    k = 0
+    while (tick_time(k) <= limit) if strict else (tick_time(k) < limit):
+        k += 1
+    return k
+
+
+PACMAN_TICKS = {mode: ticks_until(delay, strict=True) for mode, delay in MOVE_DELAYS.items()}
+GHOST_TICKS = ticks_until(GHOST_MOVE_MS)
+SCARED_GHOST_TICKS = ticks_until(SCARED_MOVE_MS)
+SCARE_TICKS = ticks_until(SCARE_MS)
+NEVER = 1 << 62
+
+
+def scare_end_tick(since, limit=SCARE_MS):
+    # since adımında korkan hayaletin korkusunun bittiği ilk adım (now - since > limit)
+    start = tick_time(since)
+    t = since + (SCARE_TICKS if limit == SCARE_MS else ticks_until(limit))
+    while tick_time(t) - start <= limit: t += 1
+    while t > since and tick_time(t - 1) - start > limit: t -= 1
+    return t
+
+
+_ZOBRIST = {}
+_PELLET_MASKS = {kind: bytes(int(b == kind) for b in range(256)) for kind in (FOOD, ENERGY)}
+
+
+def zobrist_keys(maze, num_ghosts):
+    # Harita başına sabit (tohumlu) 64-bit rastgele anahtarlar
+    keys = _ZOBRIST.get((maze.key, num_ghosts))
+    if keys is None:
+        rnd = random.Random(maze.key)
+        n = maze.n
+        keys = {
+            'pacman': [rnd.getrandbits(64) for _ in range(n)],
+            'pellet': [[0] * n] + [[rnd.getrandbits(64) for _ in range(n)] for _ in (FOOD, ENERGY)],
+            'ghost': [[rnd.getrandbits(64) for _ in range(n)] for _ in range(num_ghosts)],
+            'scared': [rnd.getrandbits(64) for _ in range(num_ghosts)],
+        }
+        _ZOBRIST[(maze.key, num_ghosts)] = keys
+    return keys
+
+
+class GameState:
+    __slots__ = ('maze', 'moves', 'keys', 'mode', 'tick', 'pacman', 'pellets', 'pellets_left', 'score',
+                 'ghosts', 'ghost_base', 'scared_since', 'scared_until', 'alive', 'game_over', 'win',
+                 'end_reason', 'hash', 'history')
+
+    @classmethod
+    def from_simulation(cls, sim):
+        # Karar anında (get_move içinden) alınan anlık görüntü: sim.ticks. adım
+        # işleniyor, Pacman henüz hareket etmedi.
+        maze = sim.maze
+        st = cls.__new__(cls)
+        st.maze = maze
+        st.moves = maze.moves
+        st.mode = sim.mode
+        st.tick = sim.ticks - 1
+        st.pacman = maze.index[tuple(sim.pacman.grid_pos)]
+        st.pellets = bytearray(map(sim.pellet_grid.__getitem__, maze.flat))
+        st.pellets_left = sim.pellets_left
+        st.score = sim.score
+        num_ghosts = sim.num_ghosts
+        st.keys = zobrist_keys(maze, num_ghosts)
+        st.ghosts = [0] * num_ghosts
+        st.ghost_base = [0] * num_ghosts
+        st.scared_since = [-1] * num_ghosts
+        st.scared_until = [0] * num_ghosts
+        st.alive = [False] * num_ghosts
+        for g in sim.ghosts:
+            st.ghosts[g.id] = maze.index[tuple(g.grid_pos)]
+            st.ghost_base[g.id] = st.tick - round(g.timer / SIM_DT)
+            st.alive[g.id] = True
+            if g.is_scared:
+                since = round(g.scared_timer / SIM_DT)
+                st.scared_since[g.id] = since
+                st.scared_until[g.id] = scare_end_tick(since)
+        st.game_over = sim.game_over
+        st.win = sim.win
+        st.end_reason = sim.end_reason
+        st.history = []
+        st.hash = st.compute_hash()
+        return st
+
+    def compute_hash(self):
+        keys = self.keys
+        h = keys['pacman'][self.pacman]
+        # Yem anahtarları C seviyesinde toplanır (büyük haritalarda on binlerce hücre)
+        for kind in (FOOD, ENERGY):
+            mask = self.pellets.translate(_PELLET_MASKS[kind])
+            h = reduce(xor, compress(keys['pellet'][kind], mask), h)
+        for gid, alive in enumerate(self.alive):
+            if alive:
+                h ^= keys['ghost'][gid][self.ghosts[gid]]
+                if self.is_scared(gid, self.tick): h ^= keys['scared'][gid]
+        return h
+
+    def clone(self):
+        st = GameState.__new__(GameState)
+        st.maze, st.moves, st.keys, st.mode = self.maze, self.moves, self.keys, self.mode
+        st.tick, st.pacman, st.pellets_left, st.score = self.tick, self.pacman, self.pellets_left, self.score
+        st.pellets = self.pellets[:]
+        st.ghosts, st.ghost_base = self.ghosts[:], self.ghost_base[:]
+        st.scared_since, st.scared_until, st.alive = self.scared_since[:], self.scared_until[:], self.alive[:]
+        st.game_over, st.win, st.end_reason, st.hash = self.game_over, self.win, self.end_reason, self.hash
+        st.history = []
+        return st
+
+    def is_scared(self, gid, tick):
+        return self.scared_since[gid] >= 0 and tick < self.scared_until[gid]
+
+    def legal_actions(self):
+        # Pacman'in geçebileceği yönler (DIRECTIONS indeksleri)
+        base = self.pacman * 4
+        return [d for d in range(4) if self.moves[base + d] >= 0]
+
+    def _next_fire(self, gid):
+        # Hayaletin bir sonraki hareket adımı (korkunun bitişi aralığı değiştirir)
+        base = self.ghost_base[gid]
+        if self.scared_since[gid] < 0: return base + GHOST_TICKS
+        until = self.scared_until[gid]
+        slow = base + SCARED_GHOST_TICKS
+        return min(slow if slow < until else NEVER, max(until, base + GHOST_TICKS))
+
+    def _random_step(self, cell, rng):
+        # GhostManager.step ile aynı kaçış kuralı ve RNG çekişi
+        d = random_step(self.moves, cell, rng.shuffle)
+        return self.moves[cell * 4 + d] if d >= 0 else cell
+
+    def apply(self, action, rng=random):
+        # action: DIRECTIONS indeksi veya None. Durum bir sonraki karar anına ilerler.
+        self.history.append((self.tick, self.pacman, self.pellets_left, self.score, self.ghosts[:],
+                             self.ghost_base[:], self.scared_since[:], self.scared_until[:], self.alive[:],
+                             self.game_over, self.win, self.end_reason, self.hash, None))
+        if self.game_over: return self
+        keys = self.keys
+        first = self.tick + 1
+        end = first + PACMAN_TICKS[self.mode]
+
+        # Pacman hareketi ve yem (sadece ilk adımda)
+        if action is not None:
+            target = self.moves[self.pacman * 4 + action]
+            if target >= 0:
+                self.hash ^= keys['pacman'][self.pacman] ^ keys['pacman'][target]
+                self.pacman = target
+        kind = self.pellets[self.pacman]
+        if kind:
+            self.pellets[self.pacman] = 0
+            self.pellets_left -= 1
+            self.hash ^= keys['pellet'][kind][self.pacman]
+            self.history[-1] = self.history[-1][:-1] + ((self.pacman, kind),)
+            if kind == FOOD:
+                self.score += 10
+            else:
+                self.score += 50
+                until = scare_end_tick(first)
+                for gid, alive in enumerate(self.alive):
+                    if alive:
+                        if not self.is_scared(gid, self.tick): self.hash ^= keys['scared'][gid]
+                        self.scared_since[gid] = first
+                        self.scared_until[gid] = until
+
+        tick = first
+        while True:
+            self._process_tick(tick, rng)
+            if self.game_over: break
+            # Sonraki olay: bir hayaletin hareketi veya hayalet kalmadı kontrolü
+            nxt = end
+            any_alive = False
+            for gid, alive in enumerate(self.alive):
+                if alive:
+                    any_alive = True
+                    f = self._next_fire(gid)
+                    if f < nxt: nxt = f
+            if not any_alive and self.alive: nxt = min(nxt, tick + 1)
+            if nxt >= end: break
+            tick = nxt
+        self.tick = end - 1 if not self.game_over else tick
+
+        # Korkusu biten hayaletlerin hash bitini kapat
+        for gid in range(len(self.alive)):
+            if self.scared_since[gid] >= 0 and self.tick >= self.scared_until[gid]:
+                self.scared_since[gid] = -1
+                if self.alive[gid]: self.hash ^= keys['scared'][gid]
+        return self
+
+    def _process_tick(self, tick, rng):
+        keys = self.keys
+        # 3-4. Kazanma kontrolleri
+        if self.pellets_left == 0:
+            self.game_over, self.win, self.end_reason = True, True, 'cleared'
+        if not any(self.alive):
+            self.game_over, self.win, self.end_reason = True, True, 'ghosts'
+            self.score += 1000
+
+        # 5. Hayalet hareketi (id sırası = Simulation'daki liste sırası)
+        pac = self.pacman
+        for gid, alive in enumerate(self.alive):
+            if not alive or self._next_fire(gid) != tick: continue
+            cell = self.ghosts[gid]
+            if self.is_scared(gid, tick):
+                new = self._random_step(cell, rng)
+            elif cell == pac:
+                new = cell
             else:
-                # NORMAL MOD: BFS ile Kovalama
-                next_move = self.bfs_chase(player_pos, layout)
-                # Eğer BFS yol bulamazsa (duvarlar kapalıysa) rastgele git
-                if next_move is None:
-                    directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-                    random.shuffle(directions)
-                    for dx, dy in directions:
-                        if layout[self.grid_pos[1] + dy][self.grid_pos[0] + dx] != 'W':
-                            next_move = (dx, dy);
-                            break
+                maze = self.maze
+                d = maze.step[cell * maze.n + pac] if maze.step is not None else maze.graph.route(cell, pac)[1]
+                new = self.moves[cell * 4 + d] if d >= 0 else self._random_step(cell, rng)
+            if new != cell:
+                self.hash ^= keys['ghost'][gid][cell] ^ keys['ghost'][gid][new]
+                self.ghosts[gid] = new
+            self.ghost_base[gid] = tick
+
+        # Çarpışma
+        for gid, alive in enumerate(self.alive):
+            if alive and self.ghosts[gid] == pac:
+                if self.is_scared(gid, tick):
+                    self.alive[gid] = False
+                    self.score += 200
+                    self.hash ^= keys['ghost'][gid][pac] ^ keys['scared'][gid]
+                else:
+                    self.game_over, self.win, self.end_reason = True, False, 'caught'
 
-            if next_move:
-                self.grid_pos[0] += next_move[0]
-                self.grid_pos[1] += next_move[1]
-                self.direction = next_move
+    def undo(self):
+        (self.tick, self.pacman, self.pellets_left, self.score, self.ghosts, self.ghost_base, self.scared_since,
+         self.scared_until, self.alive, self.game_over, self.win, self.end_reason, self.hash,
+         eaten) = self.history.pop()
+        if eaten: self.pellets[eaten[0]] = eaten[1]
+        return self
 
-            self.timer = 0
+
+# =============================================================================
+# MODÜL 6: ZAMAN BÜTÇELİ ARAMA AJANI (EXPECTIMAX)
+# =============================================================================
+# Her karar anında GameState üzerinde derinliği artırarak (iterative deepening)
+# expectimax araması yapar. Hayaletler gerçek kurallarla (GameState.apply)
+# hareket eder; korkmuş hayaletlerin rastgele adımları birkaç örnekle
+# ortalanır. Süre dolunca tamamlanmış en iyi hamle döner. Sonuçlar hamleler
+# arasında sınırlı boyutlu (LRU) bir transpozisyon tablosunda saklanır.
+
+SEARCH_BUDGET_MS = 10  # Hamle başına arama süresi (60 FPS karesine sığar)
+SEARCH_MAX_DEPTH = 40
+SEARCH_TABLE_SIZE = 200000  # Transpozisyon tablosu en fazla kayıt
+SEARCH_PELLET_RADIUS = 64  # Tablosuz haritalarda en yakın yem araması sınırı
+WIN_VALUE = 5000
+LOSE_VALUE = 100000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchAgent(PacmanAgent):
+    def __init__(self, x, y, budget_ms=SEARCH_BUDGET_MS, table_size=SEARCH_TABLE_SIZE, samples=2, weights=None):
+        super().__init__(x, y, weights)  # Ağırlıklar sadece yedek fayda hamlesinde
+        self.budget_ms = budget_ms
+        self.table_size = table_size
+        self.samples = samples  # Korkmuş hayaletler için örnek sayısı
+        self.table = OrderedDict()  # (hash, zamanlayıcı fazı) -> (derinlik, değer - skor, hamle)
+        self.rng = random.Random(0)  # Oyunun rng'sine dokunmaz
+        self.deadline = 0
+        self.nodes = 0
+        self.partial_best = None
+        # Son aramanın istatistikleri (ekranda gösterilir)
+        self.depth = 0
+        self.nps = 0
+
+    def clone(self):
+        # Transpozisyon tablosu paylaşılır (durumdan bağımsız önbellek), rng kopyalanır
+        other = super().clone()
+        other.rng = copy.copy(self.rng)
+        return other
+
+    def get_move(self, game_obj):
+        # Bütçe anlık görüntü alımını da kapsar (büyük haritalarda ms sürebilir)
+        start = time.perf_counter()
+        self.deadline = start + self.budget_ms / 1000
+        self.nodes = 0
+        st = GameState.from_simulation(game_obj)
+        actions = st.legal_actions()
+        if not actions: return 0, 0
+
+        entry = self.table.get(self.table_key(st))
+        best = entry[2] if entry and entry[2] in actions else actions[0]
+        depth = 0
+        try:
+            for d in range(1, SEARCH_MAX_DEPTH + 1):
+                best = self.search_root(st, actions, d, best)
+                depth = d
+        except SearchTimeout:
+            # Yarım kalan derinlikte önceki en iyiden daha iyisi bulunduysa o kullanılır
+            if self.partial_best is not None: best = self.partial_best
+
+        elapsed = time.perf_counter() - start
+        self.depth = depth
+        self.nps = self.nodes / elapsed if elapsed > 0 else 0
+        # Tek derinlik bile bitmediyse (çok büyük harita) fayda ajanının hamlesi
+        if depth == 0 and self.partial_best is None: return super().get_move(game_obj)
+        return DIRECTIONS[best]
+
+    def search_root(self, st, actions, depth, first):
+        # Önceki derinliğin en iyisi önce aranır; kesilirse karşılaştırma adil kalır
+        self.partial_best = None
+        best_value = -float('inf')
+        best = first
+        for a in [first] + [a for a in actions if a != first]:
+            v = self.expect(st, a, depth)
+            if v > best_value:
+                best_value, best = v, a
+                self.partial_best = a
+        self.store(st, depth, best_value, best)
+        return best
+
+    def value(self, st, depth):
+        if time.perf_counter() > self.deadline: raise SearchTimeout
+        self.nodes += 1
+        if st.game_over or depth == 0: return self.evaluate(st)
+        key = self.table_key(st)
+        entry = self.table.get(key)
+        if entry is not None:
+            self.table.move_to_end(key)
+            if entry[0] >= depth: return st.score + entry[1]
+        actions = st.legal_actions()
+        if entry is not None and entry[2] in actions:
+            actions.remove(entry[2])
+            actions.insert(0, entry[2])
+        best_value = -float('inf')
+        best = actions[0]
+        for a in actions:
+            v = self.expect(st, a, depth)
+            if v > best_value: best_value, best = v, a
+        self.store(st, depth, best_value, best, key)
+        return best_value
+
+    def expect(self, st, action, depth):
+        # Rastgelelik sadece korkmuş hayaletlerde: yoksa tek dal yeterli
+        target = st.moves[st.pacman * 4 + action]
+        stochastic = st.pellets[target] == ENERGY or any(
+            alive and st.is_scared(gid, st.tick) for gid, alive in enumerate(st.alive))
+        n = self.samples if stochastic else 1
+        total = 0
+        for _ in range(n):
+            st.apply(action, self.rng)
+            try:
+                total += self.value(st, depth - 1)
+            finally:
+                st.undo()
+        return total / n
+
+    def evaluate(self, st):
+        if st.game_over: return st.score + (WIN_VALUE if st.win else -LOSE_VALUE)
+        v = st.score
+        # En yakın yeme uzaklık (yemi yemeye yaklaşan yapraklar tercih edilir)
+        nearest = self.nearest_pellet(st)
+        if nearest != NO_PATH: v -= 3 * nearest
+        for gid, alive in enumerate(st.alive):
+            if not alive: continue
+            scared = st.is_scared(gid, st.tick)
+            d = self.distance(st, st.ghosts[gid], 20 if scared else 4)
+            if scared:
+                if d < 20: v += 5 * (20 - d)
+            elif d <= 3:
+                v -= 200 * (4 - d)
+        return v
+
+    def nearest_pellet(self, st):
+        maze = st.maze
+        dist = maze.dist
+        nearest = NO_PATH
+        if dist is not None:
+            base = st.pacman * maze.n
+            for i, kind in enumerate(st.pellets):
+                if kind and dist[base + i] < nearest: nearest = dist[base + i]
+            return nearest
+        # Tablosuz haritada Pacman'den BFS, ilk yemde (veya yarıçapta) durur
+        pellets = st.pellets
+        dist, order, _ = maze.bfs([st.pacman], SEARCH_PELLET_RADIUS, stop=pellets.__getitem__)
+        return dist[order[-1]] if pellets[order[-1]] else nearest
+
+    def distance(self, st, cell, limit):
+        # Pacman'e labirent mesafesi; tablosuz haritada limit'ten uzaksa (Manhattan
+        # alt sınırı yeterli) graf araması yapılmaz
+        maze = st.maze
+        if maze.dist is not None: return maze.dist[st.pacman * maze.n + cell]
+        (px, py), (gx, gy) = maze.cells[st.pacman], maze.cells[cell]
+        if abs(px - gx) + abs(py - gy) >= limit: return NO_PATH
+        return maze.graph.route(st.pacman, cell)[0]
+
+    def table_key(self, st):
+        # Hash konumları/yemleri kapsar; hayalet zamanlayıcı fazı ayrıca eklenir.
+        # Yenen hayaletin fazı durumu değiştirmez (-1): aynı konumlar aynı kayda düşer
+        tick = st.tick
+        return st.hash, tuple(tick - b if alive else -1 for b, alive in zip(st.ghost_base, st.alive))
+
+    def store(self, st, depth, value, action, key=None):
+        table = self.table
+        key = key or self.table_key(st)
+        table[key] = (depth, value - st.score, action)
+        table.move_to_end(key)
+        while len(table) > self.table_size: table.popitem(last=False)
 
 
 # =============================================================================
-# MODÜL 3: OYUN MOTORU (GAME ENGINE)
+# MODÜL 7: OYUN MOTORU (PENCERELİ RENDERER)
 # =============================================================================
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
-        create_beep_sound()
+DECISION_DEADLINE_MS = 12  # Karar için beklenen en uzun süre (60 FPS karesine sığar)
+TURBO_SPEEDS = (1, 2, 8, 64, 0)  # T tuşuyla sırayla; 0: sınırsız (çizim atlanır)
+MAX_FRAME_MS = 250  # Takılan kareden sonra telafi edilecek en fazla gerçek süre
+TURBO_DRAW_MS = 250  # Sınırsız modda iki çizim arası gerçek süre
+IDLE_WAIT_MS = 250  # Menü/oyun sonu ekranında olay beklerken en uzun uyku (Ctrl+C gecikmesi)
+TEXT_CACHE_SIZE = 64  # Önbellekte tutulan yazı yüzeyi sayısı (LRU)
+
+
+class DecisionWorker:
+    # Pencereli oyunda AI kararı ayrı bir iş parçacığında, simülasyonun anlık
+    # görüntüsü üzerinde hesaplanır. Kare döngüsü en fazla deadline_ms bekler;
+    # süre dolarsa güvenli bir hamleyle devam eder ve kaçırmayı sayar. Geç kalan
+    # sonuç atılır (o anki durum için hesaplanmamıştır). Ajanın durumu (hafıza,
+    # transpozisyon tablosu) işçideki kopyada tutulur, sim.pacman sadece gövdedir.
+    # Her karar ajanın bir klonunda hesaplanır ve klon sadece sonuç kabul edilince
+    # ajanın yerine geçer: geç kalan karar hafızayı ve yönü değiştirmez.
+    def __init__(self, agent, deadline_ms=DECISION_DEADLINE_MS):
+        self.agent = copy.deepcopy(agent)
+        self.deadline_ms = deadline_ms
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pacman-ai')
+        self.pending = None  # Son gönderilen iş (bitmeden yenisi gönderilmez)
+        self.decisions = 0
+        self.misses = 0
+        self.slowest_ms = 0.0  # En uzun karar süresi (gönderimden sonuca)
+
+    def _decide(self, snap, submitted):
+        agent = self.agent.clone()
+        agent.grid_pos = list(snap.pacman.grid_pos)
+        move = agent.get_move(snap)
+        self.slowest_ms = max(self.slowest_ms, (time.perf_counter() - submitted) * 1000)
+        return move, agent
+
+    def decide(self, sim, wait=False):
+        # wait: süre sınırı yok (hızlandırılmış oyunda sonuç eşzamanlı oyunla aynı kalsın)
+        self.decisions += 1
+        if self.pending is not None and not self.pending.done():
+            if not wait:
+                # Önceki karar hâlâ sürüyor: ajan meşgul, beklemeden yedek hamle
+                self.misses += 1
+                return self.fallback(sim)
+            self.pending.result()
+        self.pending = self.executor.submit(self._decide, sim.snapshot(), time.perf_counter())
         try:
-            self.eat_sound = pygame.mixer.Sound("beep.wav")
-            self.eat_sound.set_volume(0.2)
-        except:
-            self.eat_sound = None
+            move, self.agent = self.pending.result(timeout=None if wait else self.deadline_ms / 1000)
+        except FutureTimeout:
+            self.misses += 1
+            return self.fallback(sim)
+        return move
+
+    def fallback(self, sim):
+        # Son yön açıksa ve kovalayan hayalet yakın değilse devam et, değilse
+        # hayaletlerden en uzak komşuya kaç (tek sınırlı BFS)
+        maze = sim.maze
+        index = maze.index
+        options = maze.neighbors[index[tuple(sim.pacman.grid_pos)]]
+        if not options: return 0, 0
+        threat = ghost_field(maze, sim.ghost_manager.chaser_cells(), THREAT_RADIUS)
+        for d, j in options:
+            if DIRECTIONS[d] == sim.pacman.direction and threat[j] > 2: return DIRECTIONS[d]
+        return DIRECTIONS[max(options, key=lambda o: threat[o[1]])[0]]
+
+    def close(self):
+        # Süren iş beklenmez; bitince sonucu atılır
+        self.executor.shutdown(wait=False)
+
+
+class TextCache:
+    # Font ve yazı yüzeyi önbelleği: fontlar boyut başına bir kez açılır,
+    # (metin, boyut, renk) için render edilen yüzeylerin en son kullanılan
+    # limit tanesi tutulur (LRU, arama tablosundaki gibi OrderedDict).
+    def __init__(self, name='arial', limit=TEXT_CACHE_SIZE):
+        self.name = name
+        self.limit = limit
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None: font = self.fonts[size] = pygame.font.SysFont(self.name, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = self.surfaces[key] = self.font(size).render(text, True, color)
+            while len(self.surfaces) > self.limit: self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surf
 
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+class Game:
+    def __init__(self, profiler=None, record_path=None, layout=None, deadline_ms=DECISION_DEADLINE_MS, speed=1,
+                 weights=None, telemetry=None, sound=True, seed=None):
+        # Sadece gereken alt sistemler: ses kapalıyken mixer hiç açılmaz
+        pygame.display.init()
+        pygame.font.init()
+        self.sounds = SoundBank(sound)
+
+        # Pencere haritaya göre büyür (stok harita için WIDTH × HEIGHT)
+        self.layout = MAP_LAYOUT if layout is None else layout
+        self.weights = weights  # AI modlarında fayda ajanı ağırlıkları
+        self.width = max(WIDTH, len(self.layout[0]) * CELL_SIZE)
+        self.height = max(HEIGHT, len(self.layout) * CELL_SIZE + 40)
+        self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Pacman AI")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont('arial', 20)
-        self.big_font = pygame.font.SysFont('arial', 40)
+        self.text = TextCache()
+        self.font = self.text.font(20)
+        self.big_font = self.text.font(40)
+        # Oyun sonu karartması: tek yüzey, her oyun sonunda tekrar kullanılır
+        self.overlay = pygame.Surface((self.width, self.height))
+        self.overlay.set_alpha(150)
+        self.overlay.fill(BLACK)
 
         self.running = True
         self.mode = None
-        self.pacman = None
-        self.ghosts = []
-        self.foods = []
-        self.energies = []
+        self.sim = None
         self.walls = []
+        self.profiler = profiler
+        self.record_path = record_path  # Verilirse son oyun bu dosyaya kaydedilir
+        self.telemetry = telemetry  # Telemetry verilirse her oyun kaydedilir
+        self.deadline_ms = deadline_ms  # None/0: AI kararı kare döngüsünde (eşzamanlı)
+        self.decider = None
+        self.turbo_speed = speed  # AI modlarında seçili hız çarpanı (TURBO_SPEEDS); T ile değişir
+        self.speed = speed  # Bu oyunun hız çarpanı: insan modunda 1, AI modlarında turbo_speed
+        self.seed = seed  # Verilirse oyunlar seed, seed+1, ... ile tohumlanır (replay'de yeniden üretilebilir)
+        self.games = 0  # Bu pencerede başlatılan oyun sayısı
+        self.eaten = []  # Son çizimden beri yemi yenen hücreler (kare başına birden çok adım olabilir)
+        self.show_hud = profiler is not None  # F3 ile aç/kapa
+        self.hud_font = None
+
+        # Render önbellekleri
+        self.sprites = {}  # (tür, durum) -> önceden çizilmiş Surface
+        self.maze_layer = None  # Sadece duvarlar (harita yüklenince bir kez)
+        self.background = None  # Duvarlar + kalan yemler
+        self.sprite_rects = []  # Önceki karede Pacman/HUD'un çizildiği alanlar
+        self.ghost_drawn = {}  # Ekrandaki hayalet -> ((hücre, sprite anahtarı), alan)
+        self.full_redraw = True
+        self.energy_phase = None
+        self.ui_key = None
+        self.ui_surfaces = ()
 
     def load_map(self):
+        if self.sim and self.sim.recorder: self.sim.recorder.close()
+        seed = None if self.seed is None else self.seed + self.games
+        self.games += 1
+        self.sim = Simulation(self.mode, seed=seed, layout=self.layout, weights=self.weights)
+        self.sim.profiler = self.profiler
+        if self.record_path: self.sim.recorder = ReplayWriter(self.record_path, self.sim)
+        if self.telemetry: self.telemetry.attach(self.sim)
+        if self.decider: self.decider.close()
+        self.decider = None
+        if self.mode != 'HUMAN' and self.deadline_ms:
+            self.decider = DecisionWorker(self.sim.pacman, self.deadline_ms)
         self.walls = []
-        self.foods = []
-        self.energies = []
-        self.ghosts = []
-        self.score = 0
-        self.start_time = time.time()
-        self.game_over = False
-        self.win = False
-
-        ghost_colors = [RED, CYAN, PINK, ORANGE]
-        ghost_idx = 0
-
-        for r, row in enumerate(MAP_LAYOUT):
+        for r, row in enumerate(self.layout):
             for c, char in enumerate(row):
-                x, y = c * CELL_SIZE, r * CELL_SIZE
                 if char == 'W':
-                    self.walls.append(pygame.Rect(x, y, CELL_SIZE, CELL_SIZE))
-                elif char == '.':
-                    self.foods.append(pygame.Rect(x + 12, y + 12, 8, 8))
-                elif char == 'o':
-                    self.energies.append(pygame.Rect(x + 8, y + 8, 16, 16))
-                elif char == 'P':
-                    self.pacman = PacmanAgent(c, r)
-                elif char == 'G':
-                    color = ghost_colors[ghost_idx % 4]
-                    self.ghosts.append(Ghost(c, r, color))
-                    ghost_idx += 1
+                    self.walls.append(pygame.Rect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+
+        # Duvarlar oyun boyunca değişmez: bir kez çiz, her karede tekrar kullan
+        self.maze_layer = pygame.Surface(self.screen.get_size()).convert()
+        self.maze_layer.fill(BLACK)
+        for w in self.walls: pygame.draw.rect(self.maze_layer, BLUE, w)
+        self.build_background()
+        self.sprite_rects = []
+        self.ghost_drawn = {}
+        self.eaten = []
+        self.full_redraw = True
+
+    def build_background(self):
+        self.background = self.maze_layer.copy()
+        self.energy_phase = (self.sim.time_ms // 300) % 2
+        for center in self.sim.foods.values(): pygame.draw.circle(self.background, (255, 182, 193), center, 3)
+        color = WHITE if self.energy_phase == 0 else GREEN
+        for center in self.sim.energies.values(): pygame.draw.circle(self.background, color, center, 7)
+
+    def refresh_cell(self, x, y):
+        # Arka planda tek hücreyi duvar katmanı + (varsa) kalan yemle yeniden çiz
+        rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        self.background.blit(self.maze_layer, rect, rect)
+        kind = self.sim.pellet_grid[y * self.sim.grid_width + x]
+        if kind == FOOD:
+            pygame.draw.circle(self.background, (255, 182, 193), rect.center, 3)
+        elif kind == ENERGY:
+            pygame.draw.circle(self.background, WHITE if self.energy_phase == 0 else GREEN, rect.center, 7)
+        return rect
+
+    def sprite_rect(self, grid_pos):
+        size = CELL_SIZE + 2 * SPRITE_PAD
+        return pygame.Rect(grid_pos[0] * CELL_SIZE - SPRITE_PAD, grid_pos[1] * CELL_SIZE - SPRITE_PAD, size, size)
+
+    def ghosts_under(self, rect, shown):
+        # rect'e değen, ekranda duran hayaletler: sadece rect'in çevresindeki
+        # hücrelere (occupancy) bakılır, tüm hayaletler taranmaz
+        maze = self.sim.maze
+        occupancy = self.sim.ghost_manager.occupancy
+        reach = CELL_SIZE + SPRITE_PAD
+        for y in range((rect.top - reach) // CELL_SIZE + 1, (rect.bottom + SPRITE_PAD - 1) // CELL_SIZE + 1):
+            for x in range((rect.left - reach) // CELL_SIZE + 1, (rect.right + SPRITE_PAD - 1) // CELL_SIZE + 1):
+                i = maze.index.get((x, y))
+                if i is None or i not in occupancy: continue
+                for g in occupancy[i]:
+                    if g in shown and shown[g][1].colliderect(rect): yield g
+
+    def blit_sprite(self, kind, key, draw_shape, grid_pos):
+        # Her görünüm durumu bir kez çizilir; sonraki karelerde sadece blit
+        surf = self.sprites.get((kind, key))
+        if surf is None:
+            size = CELL_SIZE + 2 * SPRITE_PAD
+            surf = pygame.Surface((size, size), pygame.SRCALPHA)
+            draw_shape(surf, size // 2, size // 2, *key)
+            self.sprites[(kind, key)] = surf
+        pos = (grid_pos[0] * CELL_SIZE - SPRITE_PAD, grid_pos[1] * CELL_SIZE - SPRITE_PAD)
+        return self.screen.blit(surf, pos)
 
     def start(self):
         while self.running:
             self.menu()
             if self.running and self.mode:
                 self.run_game()
+        if self.sim and self.sim.recorder: self.sim.recorder.close()
+        if self.sim and self.sim.telemetry: self.sim.telemetry.finish()  # Yarıda kapatılan oyun
+        if self.decider: self.decider.close()
+
+    def idle_events(self):
+        # Boşta bekleme: ilk olaya kadar uyu (en fazla IDLE_WAIT_MS), sonra kuyruktakileri de al.
+        # Zaman aşımında boş liste döner; ekranda değişen bir şey yoksa yeniden çizilmez.
+        event = pygame.event.wait(IDLE_WAIT_MS)
+        if event.type == pygame.NOEVENT: return []
+        return [event] + pygame.event.get()
 
     def menu(self):
         self.mode = None
-        intro = True
-        while intro and self.running:
-            self.screen.fill(BLACK)
-            self.draw_text_centered("PACMAN AI", -60, YELLOW)
-            self.draw_text_centered("1: Insan Oyuncu", 10, WHITE)
-            self.draw_text_centered("2: Yapay Zeka (AI)", 50, WHITE)
-            self.draw_text_centered("Cikis: Pencereyi Kapat", 120, DARK_GRAY, size=20)
-            pygame.display.update()
-
-            for event in pygame.event.get():
+        redraw = True
+        while self.mode is None and self.running:
+            if redraw:
+                self.screen.fill(BLACK)
+                self.draw_text_centered("PACMAN AI", -60, YELLOW)
+                self.draw_text_centered("1: Insan Oyuncu", 10, WHITE)
+                self.draw_text_centered("2: Yapay Zeka (AI)", 50, WHITE)
+                self.draw_text_centered("3: Arama Ajani (Expectimax)", 90, WHITE)
+                self.draw_text_centered("Oyunda T: AI hizi (x1, x2, x8, x64, sinirsiz)", 120, GRAY, size=20)
+                self.draw_text_centered("Cikis: Pencereyi Kapat", 150, DARK_GRAY, size=20)
+                pygame.display.flip()
+                redraw = False
+
+            for event in self.idle_events():
                 if event.type == pygame.QUIT:
-                    self.running = False;
-                    intro = False
+                    self.running = False
                 if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1: self.mode = 'HUMAN'; intro = False
-                    if event.key == pygame.K_2: self.mode = 'AI'; intro = False
+                    if event.key == pygame.K_1: self.mode = 'HUMAN'
+                    if event.key == pygame.K_2: self.mode = 'AI'
+                    if event.key == pygame.K_3: self.mode = 'SEARCH'
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED): redraw = True
 
     def run_game(self):
         self.load_map()
-        move_timer = 0
+        self.speed = 1 if self.mode == 'HUMAN' else self.turbo_speed
+        acc = 0.0  # Henüz simüle edilmemiş süre (ms)
+        last_draw = 0.0
 
         while self.running:
-            dt = self.clock.tick(FPS)
-
-            if not self.game_over:
-                self.elapsed_time = time.time() - self.start_time
+            # Sınırsız modda kare sınırı yok; adımlar kare bütçesi dolana kadar sürer
+            frame_ms = self.clock.tick(FPS if self.speed else 0)
+            prof = self.profiler
+            if prof: t0 = prof.clock()
 
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_click = False
             for event in pygame.event.get():
                 if event.type == pygame.QUIT: self.running = False; return
-                if event.type == pygame.MOUSEBUTTONDOWN: mouse_click = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3: self.toggle_hud()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_t and self.mode != 'HUMAN':
+                    k = (TURBO_SPEEDS.index(self.speed) + 1) % len(TURBO_SPEEDS)
+                    self.speed = self.turbo_speed = TURBO_SPEEDS[k]
+                    acc = 0.0
 
-            if self.game_over:
-                if self.draw_game_over(mouse_pos, mouse_click): return
-                continue
+            if self.sim.game_over: return self.game_over_screen()
 
-            dx, dy = 0, 0
+            action = None
             if self.mode == 'HUMAN':
-                move_timer += dt
-                if move_timer > 100:
-                    keys = pygame.key.get_pressed()
-                    if keys[pygame.K_LEFT]:
-                        dx = -1
-                    elif keys[pygame.K_RIGHT]:
-                        dx = 1
-                    elif keys[pygame.K_UP]:
-                        dy = -1
-                    elif keys[pygame.K_DOWN]:
-                        dy = 1
-                    move_timer = 0
-            elif self.mode == 'AI':
-                move_timer += dt
-                if move_timer > 200:  # AI Hızı
-                    dx, dy = self.pacman.get_move(self)
-                    move_timer = 0
-
-            if dx != 0 or dy != 0:
-                nx, ny = self.pacman.grid_pos[0] + dx, self.pacman.grid_pos[1] + dy
-                if MAP_LAYOUT[ny][nx] != 'W':
-                    self.pacman.grid_pos = [nx, ny]
-                    self.pacman.direction = (dx, dy)
-
-
-            px_rect = pygame.Rect(self.pacman.grid_pos[0] * CELL_SIZE, self.pacman.grid_pos[1] * CELL_SIZE, CELL_SIZE,
-                                  CELL_SIZE)
-
-            # 1. Yemek Yeme
-            for f in self.foods[:]:
-                if px_rect.colliderect(f):
-                    self.foods.remove(f)
-                    self.score += 10
-                    if self.eat_sound: self.eat_sound.play()
-
-            # 2. Enerji Topu Yeme
-            for e in self.energies[:]:
-                if px_rect.colliderect(e):
-                    self.energies.remove(e)
-                    self.score += 50
-                    # Tüm hayaletleri korkut
-                    for g in self.ghosts:
-                        g.make_scared()
-                    if self.eat_sound: self.eat_sound.play()
-
-            # 3. KAZANMA KONTROLÜ
-            if not self.foods and not self.energies:
-                self.game_over = True
-                self.win = True
-
-            # 4. KAZANMA KONTROLÜ
-            if not self.ghosts:
-                self.game_over = True
-                self.win = True
-                self.score += 1000  # Bonus puan
-
-            # 5. HAYALET HAREKETİ VE CAN SİSTEMİ
-            for g in self.ghosts[:]:
-                g.update()
-                g.move_logic(self.pacman.grid_pos, MAP_LAYOUT)
-
-                # Çarpışma Kontrolü
-                if g.grid_pos == self.pacman.grid_pos:
-                    if g.is_scared:
-                        # --- HAYALET YENDİ ---
-                        g.lives -= 1  # Canı azalt
-                        self.score += 200  # Puan ver
-                        if self.eat_sound: self.eat_sound.play()
-
-                        if g.lives <= 0:
-                            # Canı bittiyse sil
-                            self.ghosts.remove(g)
-                        else:
-                            # Canı varsa merkeze ışınla
-                            g.grid_pos = [9, 8]  # Haritanın ortası
-                            g.is_scared = False  # Normale dön
-                    else:
-                        # --- PACMAN ÖLDÜ ---
-                        self.game_over = True
-                        self.win = False
-
-            self.draw()
+                keys = pygame.key.get_pressed()
+                if keys[pygame.K_LEFT]:
+                    action = (-1, 0)
+                elif keys[pygame.K_RIGHT]:
+                    action = (1, 0)
+                elif keys[pygame.K_UP]:
+                    action = (0, -1)
+                elif keys[pygame.K_DOWN]:
+                    action = (0, 1)
+            if prof: prof.add('input', t0)
+
+            # Sabit adımlı simülasyon: geçen gerçek süre × hız kadar SIM_DT adımı.
+            # Sonuç sadece adım dizisine bağlı; kare hızı ve hız çarpanı değiştirmez.
+            if self.speed:
+                acc += min(frame_ms, MAX_FRAME_MS) * self.speed
+                steps = int(acc // SIM_DT)
+                acc -= steps * SIM_DT
+                self.advance(action, steps=steps)
+            else:
+                self.advance(action, until=time.perf_counter() + 1 / FPS)
+
+            # Sınırsız modda sadece arada bir (ve oyun bitince) çizilir
+            now = time.perf_counter()
+            if self.speed or self.sim.game_over or now - last_draw >= TURBO_DRAW_MS / 1000:
+                last_draw = now
+                if prof: t0 = prof.clock()
+                self.draw()
+                if prof: prof.add('draw', t0)
+            if prof: prof.end_frame()
+
+    def advance(self, action, steps=None, until=None):
+        # steps adım (verilmezse until zamanına kadar) ilerle; yenen hücreler çizim için birikir
+        sim = self.sim
+        decider = self.decider
+        prof = self.profiler
+        wait = self.speed != 1  # Hızlandırılmışta karar beklenir: yedek hamle sonucu değiştirmesin
+        heard = set()  # Bu çağrıda olan olaylar (sesler)
+        done = 0
+        while not sim.game_over and (done < steps if steps is not None else time.perf_counter() < until):
+            a = action
+            if decider and sim.decision_due():
+                tel = sim.telemetry
+                if prof or tel: t0 = time.perf_counter()
+                a = decider.decide(sim, wait)
+                if prof: prof.add('decision', t0)
+                if tel: tel.decision((time.perf_counter() - t0) * 1000)
+            sim.step(a)
+            done += 1
+            if sim.events:
+                heard.update(sim.events)
+                if 'eat' in sim.events or 'energy' in sim.events: self.eaten.append(tuple(sim.pacman.grid_pos))
+        if heard: self.sounds.play_events(heard)
+        return done
+
+    def toggle_hud(self):
+        # Profiler yoksa ilk açılışta bağlanır
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+            if self.sim: self.sim.profiler = self.profiler
+        self.show_hud = not self.show_hud
+
+    def draw_hud(self):
+        if self.hud_font is None: self.hud_font = pygame.font.SysFont('consolas', 14)
+        lines = ["faz          p50    p95    p99 (ms)"]
+        for phase, (p50, p95, p99) in self.profiler.summary().items():
+            lines.append(f"{phase:<10} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        lines.append(f"FPS: {self.clock.get_fps():.1f}")
+        if self.decider:
+            d = self.decider
+            lines.append(f"kacan: {d.misses}/{d.decisions}  max {d.slowest_ms:.0f}ms")
+        panel = pygame.Rect(self.width - 250, 5, 245, 18 * len(lines) + 8)
+        pygame.draw.rect(self.screen, DARK_GRAY, panel)
+        for i, line in enumerate(lines):
+            self.screen.blit(self.hud_font.render(line, True, WHITE), (panel.x + 6, panel.y + 4 + 18 * i))
+        return panel
 
     def draw(self):
-        self.screen.fill(BLACK)
-        for w in self.walls: pygame.draw.rect(self.screen, BLUE, w)
-        for f in self.foods: pygame.draw.circle(self.screen, (255, 182, 193), f.center, 3)
-        # Enerji topu yanıp sönsün
-        if (pygame.time.get_ticks() // 300) % 2 == 0:
-            for e in self.energies: pygame.draw.circle(self.screen, WHITE, e.center, 7)
+        # Sadece değişen alanlar (dirty rect) yeniden çizilip ekrana gönderilir
+        sim = self.sim
+        now = sim.time_ms
+        screen = self.screen
+        dirty = []
+
+        # 1. Arka plan değişiklikleri: yenen yem, enerji topunun yanıp sönmesi
+        for cell in self.eaten: dirty.append(self.refresh_cell(*cell))
+        self.eaten = []
+        phase = (now // 300) % 2
+        if phase != self.energy_phase:
+            self.energy_phase = phase
+            for cell in sim.energies: dirty.append(self.refresh_cell(*cell))
+
+        # 2. Hücresi ve görünümü değişmeyen hayalet ekranda kalır; değişenin
+        # (ve yenip silinenin) eski alanı geri yüklenir
+        drawn, shown = self.ghost_drawn, {}
+        todo = set()
+        for g in sim.ghosts:
+            state = (g.cell, g.sprite_key(now))
+            prev = drawn.pop(g, None)
+            if prev is not None and prev[0] == state and not self.full_redraw:
+                shown[g] = prev
+            else:
+                todo.add(g)
+                if prev is not None: dirty.append(prev[1])
+        dirty.extend(rect for _, rect in drawn.values())
+
+        # 3. Önceki karenin Pacman/HUD alanlarını arka planla geri yükle
+        sim.pacman.update_animation()
+        pac_rect = self.sprite_rect(sim.pacman.grid_pos)
+        if self.full_redraw:
+            screen.blit(self.background, (0, 0))
         else:
-            for e in self.energies: pygame.draw.circle(self.screen, GREEN, e.center, 7)
-
-        self.pacman.draw(self.screen)
-        for g in self.ghosts: g.draw(self.screen)
-
-        # UI
-        sc = self.font.render(f"Skor: {self.score}", True, WHITE)
-        tm = self.font.render(f"Sure: {int(self.elapsed_time)}s", True, WHITE)
-        self.screen.blit(sc, (10, HEIGHT - 35));
-        self.screen.blit(tm, (150, HEIGHT - 35))
-        pygame.display.flip()
+            dirty.extend(self.sprite_rects)
+            for r in dirty: screen.blit(self.background, r, r)
+            # Geri yüklenen alana veya Pacman'in altına düşen sabit hayaletler de yeniden çizilir
+            if shown:
+                for r in dirty + [pac_rect]: todo.update(self.ghosts_under(r, shown))
+
+        # 4. Karakterler (Pacman altta, hayaletler liste sırasıyla üstte)
+        rects = [self.blit_sprite('pacman', sim.pacman.sprite_key(), PacmanAgent.draw_shape, sim.pacman.grid_pos)]
+        if todo:
+            cells = sim.maze.cells
+            for g in sim.ghosts:
+                if g in todo:
+                    state = (g.cell, g.sprite_key(now))
+                    rect = self.blit_sprite('ghost', state[1], Ghost.draw_shape, cells[state[0]])
+                    shown[g] = (state, rect)
+                    rects.append(rect)
+        self.ghost_drawn = shown
+
+        # UI (metin sadece skor/süre/arama istatistiği değişince yeniden oluşturulur)
+        search = (self.decider.agent if self.decider else sim.pacman) if sim.mode == 'SEARCH' else None
+        ui_key = (sim.score, int(sim.elapsed_time), self.speed, search and (search.depth, int(search.nps) // 1000))
+        if ui_key != self.ui_key:
+            self.ui_key = ui_key
+            speed = '' if self.speed == 1 else f"  x{self.speed}" if self.speed else "  max"
+            self.ui_surfaces = (self.font.render(f"Skor: {sim.score}", True, WHITE),
+                                self.font.render(f"Sure: {int(sim.elapsed_time)}s{speed}", True, WHITE))
+            if search:
+                self.ui_surfaces += (self.font.render(f"Derinlik: {search.depth}  {int(search.nps) // 1000}k dugum/s",
+                                                      True, WHITE),)
+        ui_rect = pygame.Rect(0, self.height - 40, self.width, 40)
+        screen.blit(self.background, ui_rect, ui_rect)
+        sc, tm = self.ui_surfaces[:2]
+        self.screen.blit(sc, (10, self.height - 35));
+        self.screen.blit(tm, (150, self.height - 35))
+        if search: self.screen.blit(self.ui_surfaces[2], (320, self.height - 35))
+        rects.append(ui_rect)
+        self.sprite_rects = [pac_rect, ui_rect]
+        if self.show_hud and self.profiler:
+            rects.append(self.draw_hud())
+            self.sprite_rects.append(rects[-1])
+
+        if self.full_redraw:
+            self.full_redraw = False
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty + rects)
 
     def draw_text_centered(self, text, y_off, color, size=40):
-        f = pygame.font.SysFont('arial', size)
-        s = f.render(text, True, color)
-        r = s.get_rect(center=(WIDTH // 2, HEIGHT // 2 + y_off))
+        s = self.text.render(text, size, color)
+        r = s.get_rect(center=(self.width // 2, self.height // 2 + y_off))
         self.screen.blit(s, r)
 
-    def draw_game_over(self, m_pos, click):
-        s = pygame.Surface((WIDTH, HEIGHT));
-        s.set_alpha(150);
-        s.fill(BLACK)
-        self.screen.blit(s, (0, 0))
-
-        p_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2 - 100, 300, 250)
+    def game_over_screen(self):
+        # Son kare bir kez karartılır; sonra sadece düğmenin üzerine gelince/ayrılınca
+        # panel yeniden çizilir. Olay yokken event.wait ile uyunur.
+        self.screen.blit(self.overlay, (0, 0))
+        self.draw_game_over(pygame.mouse.get_pos())
+        pygame.display.flip()
+        hover = self.game_over_button().collidepoint(pygame.mouse.get_pos())
+        while self.running:
+            for event in self.idle_events():
+                if event.type == pygame.QUIT: self.running = False
+                if event.type == pygame.MOUSEBUTTONDOWN and self.game_over_button().collidepoint(event.pos): return
+                if event.type == pygame.MOUSEMOTION and self.game_over_button().collidepoint(event.pos) != hover:
+                    hover = not hover
+                    pygame.display.update(self.draw_game_over(event.pos))
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.draw_game_over(pygame.mouse.get_pos())
+                    pygame.display.flip()
+
+    def game_over_button(self):
+        return pygame.Rect(self.width // 2 - 100, self.height // 2 + 50, 200, 50)
+
+    def draw_game_over(self, m_pos):
+        # Opak panel (karartma ayrıca, bir kez); dönüş: çizilen panel alanı
+        p_rect = pygame.Rect(self.width // 2 - 150, self.height // 2 - 100, 300, 250)
         pygame.draw.rect(self.screen, DARK_GRAY, p_rect)
         pygame.draw.rect(self.screen, WHITE, p_rect, 2)
 
-        msg, col = ("KAZANDIN!", GREEN) if self.win else ("KAYBETTIN!", RED)
+        msg, col = ("KAZANDIN!", GREEN) if self.sim.win else ("KAYBETTIN!", RED)
         self.draw_text_centered(msg, -60, col)
-        self.draw_text_centered(f"Skor: {self.score}", -10, WHITE, 25)
+        self.draw_text_centered(f"Skor: {self.sim.score}", -10, WHITE, 25)
 
-        self.draw_text_centered(f"Sure: {int(self.elapsed_time)}s", 20, WHITE, 25)
+        self.draw_text_centered(f"Sure: {int(self.sim.elapsed_time)}s", 20, WHITE, 25)
 
-        b_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 + 50, 200, 50)
+        b_rect = self.game_over_button()
         hover = b_rect.collidepoint(m_pos)
         pygame.draw.rect(self.screen, BUTTON_HOVER if hover else BUTTON_COLOR, b_rect)
         pygame.draw.rect(self.screen, WHITE, b_rect, 2)
 
-        t = self.font.render("ANA MENU", True, WHITE)
+        t = self.text.render("ANA MENU", 20, WHITE)
         self.screen.blit(t, t.get_rect(center=b_rect.center))
-        pygame.display.flip()
+        return p_rect
+
+
+# =============================================================================
+# MODÜL 8: KAYIT VE TEKRAR OYNATMA (REPLAY)
+# =============================================================================
+# Dosya: sabit başlık + her adım için sabit boyutlu kayıt. Kayıt boyutu sabit
+# olduğu için t. adıma doğrudan (mmap üzerinden) atlanabilir.
+#   kayıt[0]   : Pacman hamlesi (0: yok, 1-4: DIRECTIONS + 1, 5: (0, 0))
+#   kayıt[1..] : hayalet başına 4 bit (0: hareket yok, 1-4: DIRECTIONS + 1)
+
+REPLAY_MAGIC = b'PMRP'
+REPLAY_VERSION = 1
+# magic, sürüm, mod, bayraklar, hayalet sayısı, tohum, harita özeti (sha1), dt
+REPLAY_HEADER = struct.Struct('<4sBBBxHq20sd')
+REPLAY_MODES = ('AI', 'HUMAN', 'SEARCH')
+
+
+def encode_move(move):
+    if move is None: return 0
+    if move == (0, 0): return 5
+    return DIRECTIONS.index(tuple(move)) + 1
+
+
+def decode_move(code):
+    if code == 0: return None
+    if code == 5: return (0, 0)
+    return DIRECTIONS[code - 1]
+
+
+class ReplayWriter:
+    # Oyun sürerken adım adım dosyaya ekler (tamponlu, periyodik flush)
+    def __init__(self, path, sim, flush_every=600):
+        self.path = path
+        self.num_ghosts = sim.num_ghosts
+        self.record_size = 1 + (self.num_ghosts + 1) // 2
+        self.flush_every = flush_every
+        self.ticks = 0
+        self.file = open(path, 'wb', buffering=1 << 16)
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, REPLAY_MODES.index(sim.mode),
+                                           0 if sim.seed is None else 1, self.num_ghosts,
+                                           sim.seed or 0, sim.maze.digest, SIM_DT))
+        self.file.flush()
+
+    def record(self, sim):
+        rec = bytearray(self.record_size)
+        rec[0] = encode_move(sim.last_action)
+        for g in sim.ghosts:
+            if g.last_move:
+                rec[1 + g.id // 2] |= encode_move(g.last_move) << (4 * (g.id % 2))
+        self.file.write(rec)
+        self.ticks += 1
+        if self.ticks % self.flush_every == 0: self.file.flush()
+
+    def close(self):
+        if not self.file.closed: self.file.close()
+
+
+class ReplayReader:
+    # mmap ile açılır: dosya belleğe yüklenmeden istenen adıma atlanır
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = None
+        if os.fstat(self.file.fileno()).st_size >= REPLAY_HEADER.size:  # Boş dosya mmap edilemez
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, mode, flags, num_ghosts, seed, digest, dt = REPLAY_HEADER.unpack_from(self.data, 0)
+        if self.data is None or magic != REPLAY_MAGIC or version != REPLAY_VERSION or mode >= len(REPLAY_MODES):
+            self.close()
+            raise ValueError(f"{path}: geçerli bir replay dosyası değil")
+        self.mode = REPLAY_MODES[mode]
+        self.seed = seed if flags & 1 else None
+        self.num_ghosts = num_ghosts
+        self.digest = digest
+        self.dt = dt
+        self.record_size = 1 + (num_ghosts + 1) // 2
+        # Yarım kalmış son kayıt (yazım sırasında kesilmiş dosya) sayılmaz
+        self.ticks = (len(self.data) - REPLAY_HEADER.size) // self.record_size
+
+    def __len__(self):
+        return self.ticks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, 'data', None) is not None: self.data.close()
+        self.data = None
+        self.file.close()
+
+    def tick(self, t):
+        # t. adımın (Pacman hamlesi, hayalet id -> hamle listesi)
+        if not 0 <= t < self.ticks: raise IndexError(t)
+        offset = REPLAY_HEADER.size + t * self.record_size
+        rec = self.data[offset:offset + self.record_size]
+        moves = [decode_move((rec[1 + i // 2] >> (4 * (i % 2))) & 0xF) for i in range(self.num_ghosts)]
+        return decode_move(rec[0]), moves
+
+    def simulate(self, until=None, layout=None):
+        # Kuralları headless çalıştırarak until. adıma (varsayılan: son adım) ilerle.
+        # Stok harita dışında kaydedilen oyunlar için aynı layout verilmeli.
+        sim = Simulation(self.mode, seed=self.seed, layout=layout)
+        if sim.maze.digest != self.digest:
+            raise ValueError(f"{self.path}: replay farklı bir harita ile kaydedilmiş")
+        until = self.ticks if until is None else min(until, self.ticks)
+        for t in range(until):
+            action, moves = self.tick(t)
+            sim.step(action, self.dt, moves)
+        return sim
+
 
-        if hover and click: return True
-        return False
+# =============================================================================
+# MODÜL 9: TURNUVA (ÇOK ÇEKİRDEKLİ AI DEĞERLENDİRME)
+# =============================================================================
+
+def play_game(seed, max_time_ms=600000, record_dir=None, mode='AI', layout=None, weights=None, telemetry=False):
+    # Tek bir tohumlu headless AI oyunu; süreçler arası taşınabilir özet döner.
+    # record_dir verilirse kaybedilen oyunların replay'i orada kalır.
+    # telemetry: oyun kaydı özetle birlikte döner (yazma ana süreçte)
+    sim = Simulation(mode, seed=seed, layout=layout, weights=weights)
+    if telemetry: sim.telemetry = GameTelemetry(sim)
+    if record_dir:
+        path = os.path.join(record_dir, f"seed_{seed}.pmr")
+        sim.recorder = ReplayWriter(path, sim)
+    sim.run(max_time_ms=max_time_ms)
+    if record_dir:
+        sim.recorder.close()
+        if sim.end_reason != 'caught': os.remove(path)
+    result = {
+        'seed': seed,
+        'win': sim.win,
+        'reason': sim.end_reason or 'timeout',
+        'score': sim.score,
+        'time_ms': sim.time_ms,
+        'ticks': sim.ticks,
+    }
+    if telemetry: result['telemetry'] = sim.telemetry.record
+    return result
+
+
+def percentile(values, p):
+    # Sıralı listede en yakın sıra yüzdeliği
+    if not values: return 0
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def run_tournament(games, workers=None, base_seed=0, max_time_ms=600000, record_dir=None, mode='AI', layout=None,
+                   weights=None, telemetry=None):
+    # games oyunu base_seed, base_seed+1, ... tohumlarıyla tüm çekirdeklere dağıt.
+    # telemetry (Telemetry) verilirse oyun kayıtları bittikçe yazılır.
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    if record_dir: os.makedirs(record_dir, exist_ok=True)
+    # Soğuk önbellekte APSP tablosunu her işçi ayrı kurmasın: burada bir kez kurulur,
+    # işçiler onu diskten yükler (fork'ta süreç içi önbellekle birlikte gelir)
+    compile_maze(MAP_LAYOUT if layout is None else layout)
+    workers = workers or os.cpu_count() or 1
+    seeds = range(base_seed, base_seed + games)
+    play = partial(play_game, max_time_ms=max_time_ms, record_dir=record_dir, mode=mode, layout=layout,
+                   weights=weights, telemetry=telemetry is not None)
+    results = []
+
+    def collect(stream):
+        for r in stream:
+            if telemetry: telemetry.games.write(r.pop('telemetry'), block=True)
+            results.append(r)
+        return results
+
+    if workers == 1: return collect(map(play, seeds))
+    # Küçük parçalar: oyun süreleri çok farklı olabildiği için yük dengeli kalır
+    chunk = max(1, games // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return collect(pool.map(play, seeds, chunksize=chunk))
+
+
+def summarize(results):
+    scores = sorted(r['score'] for r in results)
+    survival = sorted(r['time_ms'] / 1000 for r in results if r['reason'] == 'caught')
+    clear_ticks = sorted(r['ticks'] for r in results if r['reason'] == 'cleared')
+    reasons = {}
+    for r in results: reasons[r['reason']] = reasons.get(r['reason'], 0) + 1
+    n = len(results)
+    return {
+        'games': n,
+        'win_rate': sum(r['win'] for r in results) / n if n else 0,
+        'reasons': reasons,
+        'score_mean': sum(scores) / n if n else 0,
+        'score_min': scores[0] if scores else 0,
+        'score_p10': percentile(scores, 10),
+        'score_p50': percentile(scores, 50),
+        'score_p90': percentile(scores, 90),
+        'score_max': scores[-1] if scores else 0,
+        'survival_mean_s': sum(survival) / len(survival) if survival else None,
+        'survival_p50_s': percentile(survival, 50) if survival else None,
+        'clear_ticks_mean': sum(clear_ticks) / len(clear_ticks) if clear_ticks else None,
+        'clear_ticks_p50': percentile(clear_ticks, 50) if clear_ticks else None,
+    }
+
+
+def print_summary(summary):
+    print(f"Oyun: {summary['games']} | Kazanma: {summary['win_rate'] * 100:.1f}% | Sonuclar: {summary['reasons']}")
+    print(f"Skor  ort: {summary['score_mean']:.1f}  min: {summary['score_min']}  p10: {summary['score_p10']}"
+          f"  p50: {summary['score_p50']}  p90: {summary['score_p90']}  max: {summary['score_max']}")
+    if summary['survival_mean_s'] is not None:
+        print(f"Yakalanma suresi  ort: {summary['survival_mean_s']:.1f}s  p50: {summary['survival_p50_s']:.1f}s")
+    if summary['clear_ticks_mean'] is not None:
+        print(f"Temizleme adimi  ort: {summary['clear_ticks_mean']:.0f}  p50: {summary['clear_ticks_p50']}")
+
+
+# =============================================================================
+# MODÜL 10: TELEMETRİ (AKIŞLI OYUN/ADIM KAYITLARI)
+# =============================================================================
+# İsteğe bağlı. Simülasyona bağlanan GameTelemetry oyun boyunca sayaç tutar
+# (yenen hayalet, karar süresi histogramı) ve oyun bitince tek bir oyun kaydı
+# üretir; istenirse her N adımda bir adım örneği de alınır. Kayıtlar
+# TelemetryWriter'a verilir: kuyruğa atılır, arka plandaki iş parçacığı toplu
+# yazar ve dosya büyüyünce döndürür (games.jsonl -> games.jsonl.1 ...). Kuyruk
+# doluysa kayıt atılır ve sayılır; kare döngüsü hiçbir zaman diske beklemez.
+
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)  # Son kova: 50ms üstü
+GAME_FIELDS = ('started', 'mode', 'seed', 'outcome', 'reason', 'score', 'ticks', 'time_ms', 'pellets_left',
+               'ghosts_eaten', 'caught_by', 'death_cell', 'decisions', 'latency_hist')
+TICK_FIELDS = ('started', 'tick', 'score', 'pacman', 'pellets_left', 'ghosts', 'scared')
+TELEMETRY_ROTATE_BYTES = 64 << 20
+TELEMETRY_BACKUPS = 5
+TELEMETRY_POLL_S = 0.5  # Dolu kuyrukta bekleyen yazımın yazıcının hâlâ çalıştığını kontrol aralığı
+_CLOSE = object()
+
+
+class TelemetryWriter:
+    # Tek dosyalık kayıt akışı; biçim uzantıdan (.csv, aksi hâlde JSONL)
+    def __init__(self, path, fields, max_bytes=TELEMETRY_ROTATE_BYTES, backups=TELEMETRY_BACKUPS,
+                 queue_size=100000):
+        self.path = path
+        self.fields = fields
+        self.csv = path.endswith('.csv')
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0  # Kuyruk dolu olduğu için atılan kayıtlar
+        self.written = 0
+        self.file = None
+        self.error = None  # Yazıcı iş parçacığını durduran hata; close() yükseltir
+        self.thread = threading.Thread(target=self._run, name='pacman-telemetry', daemon=True)
+        self.thread.start()
+
+    def write(self, record, block=False):
+        # Kare döngüsünden çağrılır: varsayılan olarak asla bloklamaz (turnuva bekleyebilir).
+        # Yazıcı durduysa bekleyen yazım da kaydı atar, kuyruk hiç boşalmayacağı için takılmaz.
+        while True:
+            wait = block and self.thread.is_alive()
+            try:
+                self.queue.put(record, wait, TELEMETRY_POLL_S)
+                return
+            except queue.Full:
+                if not wait:
+                    self.dropped += 1
+                    return
+
+    def close(self):
+        # Kuyruk doluysa yazıcı çalıştığı sürece yer açılmasını bekle; durduysa bekleme
+        while self.thread.is_alive():
+            try:
+                self.queue.put(_CLOSE, timeout=TELEMETRY_POLL_S)
+                break
+            except queue.Full:
+                continue
+        self.thread.join()
+        if self.error is not None: raise self.error
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a', newline='', buffering=1 << 16)
+        if self.csv:
+            self.csv_writer = csv.writer(self.file)
+            if self.file.tell() == 0: self.csv_writer.writerow(self.fields)
+
+    def _rotate(self):
+        self.file.close()
+        for k in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{k}"): os.replace(f"{self.path}.{k}", f"{self.path}.{k + 1}")
+        if self.backups: os.replace(self.path, f"{self.path}.1")
+        else: os.remove(self.path)
+        self._open()
+
+    def _encode(self, record):
+        if not self.csv: return json.dumps(record, separators=(',', ':')) + '\n'
+        # CSV'de listeler boşlukla ayrılır, None boş hücre olur
+        return [' '.join(map(str, v)) if isinstance(v, (list, tuple)) else ('' if v is None else v)
+                for v in (record.get(f) for f in self.fields)]
+
+    def _run(self):
+        # Hata iş parçacığını sessizce bitirmesin: saklanır, close() yükseltir
+        try:
+            self._open()
+            self._serve()
+        except Exception as e:
+            self.error = e
+            if self.file is not None and not self.file.closed:
+                try:
+                    self.file.close()
+                except OSError:
+                    pass
+
+    def _serve(self):
+        get = self.queue.get
+        while True:
+            batch = [get()]
+            # Kuyrukta bekleyenleri de al: tek seferde yaz, tek flush
+            while len(batch) < 4096:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = False
+            for record in batch:
+                if record is _CLOSE:
+                    closing = True
+                    continue
+                if self.csv: self.csv_writer.writerow(self._encode(record))
+                else: self.file.write(self._encode(record))
+                self.written += 1
+            self.file.flush()
+            if self.max_bytes and self.file.tell() >= self.max_bytes: self._rotate()
+            if closing:
+                self.file.close()
+                return
+
+
+class GameTelemetry:
+    # Simulation.telemetry olarak bağlanır (replay kaydedici gibi); adım sonunda on_step çağrılır
+    def __init__(self, sim, games=None, ticks=None, tick_every=0):
+        self.games = games  # Oyun kayıtları için TelemetryWriter (None: sadece self.record)
+        self.ticks = ticks  # Adım örnekleri için TelemetryWriter
+        self.tick_every = tick_every if ticks else 0
+        self.sim = sim
+        self.started = time.time()
+        self.ghosts_eaten = 0
+        self.decisions = 0
+        self.latency_hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.record = None  # Oyun bitince dolar
+
+    def decision(self, ms):
+        self.decisions += 1
+        hist = self.latency_hist
+        for k, edge in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= edge:
+                hist[k] += 1
+                return
+        hist[-1] += 1
+
+    def on_step(self, sim):
+        if self.record is not None: return
+        self.ghosts_eaten += sim.events.count('ghost')
+        if self.tick_every and sim.ticks % self.tick_every == 0:
+            self.ticks.write({'started': self.started, 'tick': sim.ticks, 'score': sim.score,
+                              'pacman': list(sim.pacman.grid_pos), 'pellets_left': sim.pellets_left,
+                              'ghosts': len(sim.ghosts), 'scared': sum(g.is_scared for g in sim.ghosts)})
+        if sim.game_over: self.finish()
+
+    def finish(self):
+        # Oyun bitti (veya yarıda kaldı): oyun kaydını bir kez üret
+        if self.record is not None: return self.record
+        sim = self.sim
+        caught = sim.caught_by
+        self.record = {
+            'started': self.started,
+            'mode': sim.mode,
+            'seed': sim.seed,
+            'outcome': 'win' if sim.win else ('loss' if sim.game_over else 'unfinished'),
+            'reason': sim.end_reason or 'unfinished',
+            'score': sim.score,
+            'ticks': sim.ticks,
+            'time_ms': round(sim.time_ms, 1),
+            'pellets_left': sim.pellets_left,
+            'ghosts_eaten': self.ghosts_eaten,
+            'caught_by': caught,
+            'death_cell': list(sim.pacman.grid_pos) if caught is not None else None,
+            'decisions': self.decisions,
+            'latency_hist': self.latency_hist,
+        }
+        if self.games: self.games.write(self.record)
+        return self.record
+
+
+class Telemetry:
+    # Bir dizin altındaki oyun ve (istenirse) adım akışları: games.jsonl / ticks.jsonl (veya .csv)
+    def __init__(self, directory, fmt='jsonl', tick_every=0, max_bytes=TELEMETRY_ROTATE_BYTES):
+        self.games = TelemetryWriter(os.path.join(directory, f"games.{fmt}"), GAME_FIELDS, max_bytes)
+        self.ticks = TelemetryWriter(os.path.join(directory, f"ticks.{fmt}"), TICK_FIELDS, max_bytes) \
+            if tick_every else None
+        self.tick_every = tick_every
+
+    def attach(self, sim):
+        sim.telemetry = GameTelemetry(sim, self.games, self.ticks, self.tick_every)
+        return sim.telemetry
+
+    def close(self):
+        try:
+            self.games.close()
+        finally:
+            if self.ticks: self.ticks.close()
+
+
+def telemetry_paths(path):
+    # Döndürülmüş dosyalar dahil, en eskiden yeniye
+    rotated = []
+    k = 1
+    while os.path.exists(f"{path}.{k}"):
+        rotated.append(f"{path}.{k}")
+        k += 1
+    return rotated[::-1] + ([path] if os.path.exists(path) else [])
+
+
+# CSV hücrelerinin türleri (JSONL'de türler zaten korunur); listede olmayanlar metin kalır
+_CSV_TYPES = dict.fromkeys(('seed', 'score', 'ticks', 'pellets_left', 'ghosts_eaten', 'caught_by', 'decisions',
+                            'tick', 'ghosts', 'scared'), int)
+_CSV_TYPES.update(dict.fromkeys(('started', 'time_ms'), float))
+_CSV_TYPES.update(dict.fromkeys(('latency_hist', 'death_cell', 'pacman'), lambda v: [int(x) for x in v.split()]))
+
+
+def read_telemetry(path):
+    # Kayıtları tek tek üretir (bellekte biriktirmez); döndürülmüş dosyaları da okur
+    is_csv = path.endswith('.csv')
+    for p in telemetry_paths(path):
+        with open(p, newline='') as f:
+            if is_csv:
+                rows = csv.reader(f)
+                fields = next(rows, None)
+                if fields is None: continue
+                types = [_CSV_TYPES.get(k, str) for k in fields]
+                for row in rows:
+                    yield {k: (t(v) if v else None) for k, t, v in zip(fields, types, row)}
+            else:
+                for line in f:
+                    if line.strip(): yield json.loads(line)
+
+
+_SUMMARY_FIELDS = ('outcome', 'reason', 'score', 'ticks', 'ghosts_eaten', 'caught_by', 'decisions', 'latency_hist')
+
+
+def aggregate_telemetry(records):
+    # Tek geçişte özet; bellek kayıt sayısından bağımsız (skorlar değer -> adet sayacında).
+    # Oyun kaydı olmayan satırda (ör. adım dosyası) ValueError
+    n = wins = ticks = ghosts = decisions = 0
+    score_sum = 0
+    score_counts = {}
+    reasons = {}
+    caught_by = {}
+    hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for r in records:
+        missing = [k for k in _SUMMARY_FIELDS if k not in r]
+        if missing: raise ValueError(f"{n + 1}. kayıt oyun kaydı değil (eksik alanlar: {', '.join(missing)})")
+        n += 1
+        wins += r['outcome'] == 'win'
+        score_sum += r['score']
+        score_counts[r['score']] = score_counts.get(r['score'], 0) + 1
+        ticks += r['ticks']
+        ghosts += r['ghosts_eaten']
+        decisions += r['decisions']
+        reasons[r['reason']] = reasons.get(r['reason'], 0) + 1
+        if r['caught_by'] is not None: caught_by[r['caught_by']] = caught_by.get(r['caught_by'], 0) + 1
+        for k, c in enumerate(r['latency_hist']): hist[k] += c
+
+    def score_pct(p):
+        # Sayaç üzerinden en yakın sıra yüzdeliği (percentile ile aynı tanım)
+        k = min(n - 1, max(0, int(round(p / 100 * (n - 1)))))
+        for score in sorted(score_counts):
+            k -= score_counts[score]
+            if k < 0: return score
+        return 0
+
+    return {
+        'games': n,
+        'win_rate': wins / n if n else 0,
+        'reasons': reasons,
+        'caught_by': caught_by,
+        'score_mean': score_sum / n if n else 0,
+        'score_p10': score_pct(10) if n else 0,
+        'score_p50': score_pct(50) if n else 0,
+        'score_p90': score_pct(90) if n else 0,
+        'ticks_mean': ticks / n if n else 0,
+        'ghosts_eaten_mean': ghosts / n if n else 0,
+        'decisions': decisions,
+        'latency_hist': hist,
+    }
+
+
+def print_telemetry(summary):
+    print(f"Oyun: {summary['games']} | Kazanma: {summary['win_rate'] * 100:.1f}% | Sonuclar: {summary['reasons']}"
+          f" | Yakalayan hayalet: {summary['caught_by']}")
+    print(f"Skor  ort: {summary['score_mean']:.1f}  p10: {summary['score_p10']}  p50: {summary['score_p50']}"
+          f"  p90: {summary['score_p90']} | Adim ort: {summary['ticks_mean']:.0f}"
+          f" | Yenen hayalet ort: {summary['ghosts_eaten_mean']:.2f}")
+    edges = [f"<={e}ms" for e in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    total = summary['decisions'] or 1
+    print("Karar suresi: " + "  ".join(f"{e} {c * 100 / total:.1f}%"
+                                       for e, c in zip(edges, summary['latency_hist']) if c))
 
 
 # =============================================================================
 # MAIN
 # =============================================================================
 if __name__ == "__main__":
-    game = Game()
-    game.start()
-    pygame.quit()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pacman AI")
+    parser.add_argument('--headless', action='store_true', help="Pencere açmadan tek bir AI oyunu simüle et")
+    parser.add_argument('--max-time', type=float, default=600,
+                        help="Headless oyun için simülasyon süresi sınırı (s)")
+    parser.add_argument('--tournament', type=int, metavar='K',
+                        help="K tohumlu AI oyunu oynat ve istatistikleri yazdır")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Turnuva süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument('--search', action='store_true',
+                        help="Headless/turnuvada zaman bütçeli arama ajanını kullan")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="İlk oyunun tohumu (sonrakiler +1); varsayılan 0, pencerede rastgele")
+    parser.add_argument('--profile', action='store_true', help="Kare fazlarını ölç (pencerede F3 ile HUD)")
+    parser.add_argument('--trace', metavar='DOSYA',
+                        help="Çıkışta Chrome trace JSON dosyası yaz (--profile içerir)")
+    parser.add_argument('--record', metavar='YOL',
+                        help="Oyunu replay dosyasına kaydet (turnuvada: kaybedilen oyunlar için klasör)")
+    parser.add_argument('--replay', metavar='DOSYA', help="Replay dosyasını headless oynat ve durumu yazdır")
+    parser.add_argument('--tick', type=int, default=None, help="Replay'de ilerlenecek adım (varsayılan: son adım)")
+    parser.add_argument('--map', metavar='DOSYA', help="Haritayı metin dosyasından yükle")
+    parser.add_argument('--generate', metavar='GxY', help="--seed ile tohumlu labirent üret (örn. 201x201)")
+    parser.add_argument('--save-map', metavar='DOSYA', help="Kullanılan haritayı dosyaya yaz")
+    parser.add_argument('--weights', metavar='DOSYA',
+                        help="Fayda ajanı ağırlıklarını JSON dosyasından yükle (tune.py çıktısı)")
+    parser.add_argument('--telemetry', metavar='DIZIN',
+                        help="Oyun kayıtlarını dizine akıt (games.jsonl, döndürülür)")
+    parser.add_argument('--telemetry-format', choices=('jsonl', 'csv'), default='jsonl', help="Telemetri dosya biçimi")
+    parser.add_argument('--telemetry-ticks', type=int, default=0, metavar='N',
+                        help="Her N adımda bir adım örneği yaz (ticks.jsonl; turnuvada yok)")
+    parser.add_argument('--telemetry-summary', metavar='DOSYA', help="Telemetri oyun dosyasını akışla özetle")
+    parser.add_argument('--mute', action='store_true', help="Sesi kapat (ses sistemi hiç başlatılmaz)")
+    parser.add_argument('--turbo', choices=[str(v) for v in TURBO_SPEEDS if v] + ['max'], default='1',
+                        help="Pencerede AI oyun hızı çarpanı (max: sınırsız, çizim atlanır);"
+                             " oyunda T ile değişir")
+    parser.add_argument('--deadline', type=float, default=DECISION_DEADLINE_MS,
+                        help="Pencerede AI kararı için en fazla bekleme (ms); 0: kare döngüsünde hesapla")
+    args = parser.parse_args()
+    profiler = FrameProfiler() if args.profile or args.trace else None
+    seed = 0 if args.seed is None else args.seed  # Headless, turnuva ve üretilen harita için
+
+    layout = None
+    try:
+        if args.map:
+            layout = load_layout(args.map)
+        elif args.generate:
+            w, h = (int(v) for v in args.generate.lower().split('x'))
+            layout = generate_maze(w, h, seed=seed)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.save_map: save_layout(args.save_map, layout or MAP_LAYOUT)
+    weights = None
+    if args.weights:
+        try:
+            weights = load_weights(args.weights)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    telemetry = None
+    if args.telemetry:
+        telemetry = Telemetry(args.telemetry, args.telemetry_format,
+                              0 if args.tournament else args.telemetry_ticks)
+
+    if args.telemetry_summary:
+        if not telemetry_paths(args.telemetry_summary):
+            parser.error(f"telemetri dosyası bulunamadı: {args.telemetry_summary}")
+        try:
+            summary = aggregate_telemetry(read_telemetry(args.telemetry_summary))
+        except (OSError, ValueError) as e:
+            parser.error(f"{args.telemetry_summary}: {e}")
+        print_telemetry(summary)
+    elif args.replay:
+        try:
+            with ReplayReader(args.replay) as replay:
+                t0 = time.perf_counter()
+                sim = replay.simulate(args.tick, layout)
+                took = time.perf_counter() - t0
+                ticks = len(replay)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        result = "KAZANDI" if sim.win else ("KAYBETTI" if sim.game_over else "DEVAM EDIYOR")
+        print(f"Adım {sim.ticks}/{ticks} | {result} | Skor: {sim.score} | Sure: {sim.elapsed_time:.1f}s"
+              f" | Pacman: {tuple(sim.pacman.grid_pos)} | {took * 1000:.0f}ms")
+    elif args.tournament:
+        results = run_tournament(args.tournament, args.workers, seed, args.max_time * 1000, args.record,
+                                 'SEARCH' if args.search else 'AI', layout, weights, telemetry)
+        print_summary(summarize(results))
+    elif args.headless:
+        sim = Simulation('SEARCH' if args.search else 'AI', seed=seed, layout=layout, weights=weights)
+        sim.profiler = profiler
+        if args.record: sim.recorder = ReplayWriter(args.record, sim)
+        if telemetry: telemetry.attach(sim)
+        sim.run(max_time_ms=args.max_time * 1000)
+        if sim.recorder: sim.recorder.close()
+        result = "KAZANDI" if sim.win else ("KAYBETTI" if sim.game_over else "SURE DOLDU")
+        print(f"{result} | Skor: {sim.score} | Sure: {sim.elapsed_time:.1f}s")
+        if profiler:
+            for phase, (p50, p95, p99) in profiler.summary().items():
+                print(f"{phase:<10} p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+    else:
+        speed = 0 if args.turbo == 'max' else int(args.turbo)
+        game = Game(profiler, args.record, layout, args.deadline, speed, weights, telemetry, not args.mute, args.seed)
+        game.start()
+        profiler = game.profiler
+        pygame.quit()
+    if args.trace and profiler: profiler.export_trace(args.trace)
+    if telemetry: telemetry.close()
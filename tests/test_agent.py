@@ -0,0 +1,37 @@
+import pacman
+
+# Halka çekirdek ve sağa uzanan 8 hücrelik çıkmaz; hayalet (2,1) çıkmazın dibine (11,2) 10 adım,
+# Pacman (10,2) dipten bir önceki hücrede
+DEAD_END_LAYOUT = [
+    "WWWWWWWWWWWWW",
+    "W.G.WWWWWWWWW",
+    "W.W.      P W",
+    "W...WWWWWWWWW",
+    "WWWWWWWWWWWWW",
+]
+
+
+def test_dead_end_depth_and_mouth():
+    maze = pacman.compile_maze(DEAD_END_LAYOUT)
+    tip, mouth = maze.index[(11, 2)], maze.index[(3, 2)]
+    assert maze.dead_end_depth[tip] == 8
+    assert maze.dead_end_mouth[tip] == mouth
+    assert maze.dead_end_depth[mouth] == 0 and maze.dead_end_mouth[mouth] == mouth
+
+
+def test_deep_dead_end_sees_ghost_beyond_threat_radius():
+    sim = pacman.Simulation(seed=0, layout=DEAD_END_LAYOUT)
+    maze = sim.maze
+    ghost = maze.index[(2, 1)]
+    assert maze.bfs([ghost])[0][maze.index[(11, 2)]] == 10 > pacman.THREAT_RADIUS
+    # Dip de hayaletin yetişebileceği çıkmazın parçası: oraya kaçmak geri dönmekten iyi görünmemeli
+    assert sim.pacman.get_move(sim) == (-1, 0)
+
+
+def test_search_table_key_ignores_dead_ghost_phase():
+    sim = pacman.Simulation('SEARCH', seed=1)
+    a = pacman.GameState.from_simulation(sim)
+    b = a.clone()
+    a.alive[0] = b.alive[0] = False
+    a.ghost_base[0], b.ghost_base[0] = 5, 17
+    assert sim.pacman.table_key(a) == sim.pacman.table_key(b)
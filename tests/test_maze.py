@@ -0,0 +1,33 @@
+import pacman
+
+
+def test_corridor_route_matches_step_table():
+    # Tablosuz haritalardaki yol bulma, eşit yollarda step tablosuyla aynı ilk adımı seçmeli
+    maze = pacman.compile_maze(pacman.MAP_LAYOUT)
+    graph = pacman.CorridorGraph(maze)
+    n = maze.n
+    for i in range(n):
+        for j in range(n):
+            if i != j: assert graph.route(i, j) == (maze.dist[i * n + j], maze.step[i * n + j])
+
+
+def test_corridor_route_matches_chase_field():
+    # GameState (route) ve GhostManager (DistanceField) tablosuz haritada aynı kovalama adımını atmalı
+    maze = pacman.compile_maze(pacman.generate_maze(101, 101, seed=2))
+    assert maze.step is None
+    field = pacman.DistanceField(maze)
+    # İlk iki çift eşit uzunlukta iki yolun ayrıldığı hücreler
+    pairs = [((57, 75), (69, 67)), ((87, 21), (99, 11))]
+    pairs += [(maze.cells[i], maze.cells[j]) for j in range(0, maze.n, maze.n // 5) for i in range(0, maze.n, 97)]
+    for start, target in pairs:
+        i, source = maze.index[start], maze.index[target]
+        if i == source: continue
+        field.set_source(source)
+        assert maze.graph.route(i, source) == (field.distance(i), field.step_from(i))
+
+
+def test_cache_limit_falls_back_on_bad_env(monkeypatch):
+    monkeypatch.setenv('PACMAN_CACHE_MAX_MB', '1G')
+    assert pacman._cache_max_bytes() == 256 << 20
+    monkeypatch.setenv('PACMAN_CACHE_MAX_MB', '64')
+    assert pacman._cache_max_bytes() == 64 << 20
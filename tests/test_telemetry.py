@@ -0,0 +1,13 @@
+import pytest
+
+import pacman
+
+
+def test_summary_rejects_tick_records():
+    ticks = [{'started': 1.0, 'tick': 50, 'score': 10, 'pacman': [1, 1], 'pellets_left': 3, 'ghosts': 4, 'scared': 0}]
+    with pytest.raises(ValueError, match='outcome'):
+        pacman.aggregate_telemetry(ticks)
+
+
+def test_summary_of_missing_file_is_empty_path_list(tmp_path):
+    assert pacman.telemetry_paths(str(tmp_path / 'games.jsonl')) == []
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pacman
+
+# =============================================================================
+# FAYDA AJANI AĞIRLIK ARAMASI (EVRİM STRATEJİSİ)
+# =============================================================================
+# Ağırlıklar log uzayında aranır: w_i = DEFAULT_WEIGHTS[i] * exp(x_i). Her nesilde
+# köşegen Gauss'tan popülasyon örneklenir (ilk aday her zaman ortalamanın
+# kendisi), adaylar headless oyunlarla tüm çekirdeklerde değerlendirilir ve en
+# iyi mu aday sıra ağırlıklarıyla yeni ortalamayı ve adım boylarını belirler
+# (köşegen CMA-ES'in sadeleştirilmiş hâli / cross-entropy yöntemi).
+#
+# - Ortak tohumlar: bir nesildeki tüm adaylar aynı tohumlarla oynar, farklar
+#   şanstan değil ağırlıklardan gelir. Tohumlar nesilden nesile değişir.
+# - Erken eleme: tohumlar turlara bölünür; her turdan sonra adayların yarısı
+#   (en az mu kadarı kalacak şekilde) elenir ve kalan turları oynamaz.
+# - Kontrol noktası: her nesilden sonra durum JSON olarak yazılır; aynı
+#   dosyayla yeniden başlatılan arama kaldığı nesilden devam eder.
+
+NAMES = list(pacman.DEFAULT_WEIGHTS)
+WIN_BONUS = 1000  # Uygunluk = ortalama skor + WIN_BONUS × kazanma oranı
+ROUNDS = 3  # Erken eleme turları
+MIN_SIGMA = 0.05
+
+
+def weights_of(x):
+    return {name: pacman.DEFAULT_WEIGHTS[name] * math.exp(v) for name, v in zip(NAMES, x)}
+
+
+def play(args):
+    # Süreç havuzunda çalışır: (aday, tohum) -> (aday, uygunluk katkısı)
+    cand, weights, seed, max_time_ms, layout = args
+    r = pacman.play_game(seed, max_time_ms, mode='AI', layout=layout, weights=weights)
+    return cand, r['score'] + WIN_BONUS * r['win']
+
+
+def evaluate(pool, workers, population, seeds, mu, max_time_ms, layout):
+    # Yarış: her turda hayatta kalan adaylar aynı tohum parçasını oynar.
+    # Dönüş: aday -> (oynanan oyun sayısı, ortalama uygunluk)
+    totals = [0.0] * len(population)
+    played = [0] * len(population)
+    alive = list(range(len(population)))
+    per_round = -(-len(seeds) // ROUNDS)
+    for r in range(ROUNDS):
+        chunk = seeds[r * per_round:(r + 1) * per_round]
+        if not chunk: break
+        jobs = [(c, weights_of(population[c]), sd, max_time_ms, layout) for c in alive for sd in chunk]
+        results = pool.map(play, jobs, chunksize=max(1, len(jobs) // (workers * 4))) if pool else map(play, jobs)
+        for c, fitness in results:
+            totals[c] += fitness
+            played[c] += 1
+        if r < ROUNDS - 1:
+            alive.sort(key=lambda c: totals[c] / played[c], reverse=True)
+            alive = alive[:max(mu, len(alive) // 2)]
+    return {c: (played[c], totals[c] / played[c]) for c in range(len(population))}
+
+
+def new_state(dim, sigma):
+    return {'generation': 0, 'mean': [0.0] * dim, 'sigma': [sigma] * dim,
+            'best': None, 'best_fitness': None, 'history': []}
+
+
+def save_checkpoint(path, state):
+    # Yarım yazılmış dosya kalmasın: önce geçici dosya, sonra atomik yer değiştirme
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f: json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def search(generations, population_size=16, mu=4, games=24, sigma=0.5, workers=None, seed=0,
+           max_time_ms=120000, layout=None, checkpoint=None, log=print):
+    state = None
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f: state = json.load(f)
+        if len(state['mean']) != len(NAMES): raise ValueError(f"{checkpoint}: ağırlık sayısı uyuşmuyor")
+        log(f"Kontrol noktasından devam: nesil {state['generation']}")
+    if state is None: state = new_state(len(NAMES), sigma)
+
+    # Sıra ağırlıkları (log tabanlı, toplamı 1)
+    ranks = [math.log(mu + 0.5) - math.log(k + 1) for k in range(mu)]
+    ranks = [r / sum(ranks) for r in ranks]
+    workers = workers or os.cpu_count() or 1
+    pacman.compile_maze(pacman.MAP_LAYOUT if layout is None else layout)  # Tablo işçilerden önce bir kez kurulur
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while state['generation'] < generations:
+            g = state['generation']
+            t0 = time.perf_counter()
+            # Nesil başına tohumlanmış: devam eden arama aynı adayları üretir
+            rng = random.Random(seed * 1000003 + g)
+            mean, sig = state['mean'], state['sigma']
+            population = [list(mean)] + [[m + s * rng.gauss(0, 1) for m, s in zip(mean, sig)]
+                                         for _ in range(population_size - 1)]
+            seeds = [seed * 1000003 + g * games + k for k in range(games)]
+            scores = evaluate(pool, workers, population, seeds, mu, max_time_ms, layout)
+
+            # Sadece tüm tohumları oynamış adaylar seçilebilir (elemeden sağ çıkanlar)
+            finished = sorted((c for c in scores if scores[c][0] == len(seeds)),
+                              key=lambda c: scores[c][1], reverse=True)
+            elite = finished[:mu]
+            new_mean = [sum(w * population[c][i] for w, c in zip(ranks, elite)) for i in range(len(NAMES))]
+            new_sigma = [max(MIN_SIGMA, 0.5 * s + 0.5 * math.sqrt(sum(w * (population[c][i] - mean[i]) ** 2
+                                                                       for w, c in zip(ranks, elite))))
+                         for i, s in enumerate(sig)]
+
+            top = elite[0]
+            fitness = scores[top][1]
+            if state['best_fitness'] is None or fitness > state['best_fitness']:
+                state['best'], state['best_fitness'] = weights_of(population[top]), fitness
+            state['history'].append({'generation': g, 'best': fitness, 'mean_candidate': scores[0][1],
+                                     'games': sum(n for n, _ in scores.values()),
+                                     'seconds': round(time.perf_counter() - t0, 1)})
+            state['mean'], state['sigma'] = new_mean, new_sigma
+            state['generation'] = g + 1
+            if checkpoint: save_checkpoint(checkpoint, state)
+            h = state['history'][-1]
+            log(f"Nesil {g + 1}/{generations}  en iyi {fitness:8.1f}  ortalama aday {h['mean_candidate']:8.1f}"
+                f"  sigma {sum(new_sigma) / len(new_sigma):.3f}  oyun {h['games']}  {h['seconds']}s")
+    finally:
+        if pool: pool.shutdown()
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fayda ajanı ağırlıklarını paralel evrim stratejisiyle ara")
+    parser.add_argument('--generations', type=int, default=20, help="Toplam nesil sayısı (devam ederken de)")
+    parser.add_argument('--population', type=int, default=16, help="Nesil başına aday sayısı")
+    parser.add_argument('--elite', type=int, default=4, help="Yeni ortalamayı belirleyen en iyi aday sayısı")
+    parser.add_argument('--games', type=int, default=24, help="Aday başına en fazla oyun (ortak tohumlar)")
+    parser.add_argument('--sigma', type=float, default=0.5, help="Başlangıç adım boyu (log uzayında)")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument('--seed', type=int, default=0, help="Arama tohumu")
+    parser.add_argument('--max-time', type=float, default=120, help="Oyun başına simülasyon süresi sınırı (s)")
+    parser.add_argument('--map', metavar='DOSYA', help="Haritayı metin dosyasından yükle")
+    parser.add_argument('--checkpoint', default='tune_checkpoint.json', help="Kontrol noktası dosyası")
+    parser.add_argument('--out', default='weights.json', help="En iyi ağırlıkların yazılacağı dosya")
+    args = parser.parse_args(argv)
+    if args.elite > args.population: parser.error("--elite, --population'dan büyük olamaz")
+
+    try:
+        layout = pacman.load_layout(args.map) if args.map else None
+        state = search(args.generations, args.population, args.elite, args.games, args.sigma, args.workers,
+                       args.seed, args.max_time * 1000, layout, args.checkpoint)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if state['best'] is None: return 1
+    with open(args.out, 'w') as f: json.dump(state['best'], f, indent=2)
+    print(f"En iyi uygunluk {state['best_fitness']:.1f} -> {args.out}"
+          f" (kullanım: python pacman.py --weights {args.out})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())